@@ -19,6 +19,7 @@ import logging
 import json
 import os 
 from RuleService import RuleService
+from StageTimer import timed
 
 class ADSService(RuleService):
     def __init__(self):
@@ -41,7 +42,8 @@ class ADSService(RuleService):
         try:
             # print("Send to ADS URL : "+ fullPath)
 
-            response = requests.post(fullPath, headers=headers, json=params, verify=False)
+            with timed("decision"):
+                response = requests.post(fullPath, headers=headers, json=params, verify=False)
 
             # print("Received response from ADS: ", response)
 
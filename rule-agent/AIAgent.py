@@ -13,36 +13,71 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 #
-from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import FastEmbedEmbeddings
-from langchain_community.document_loaders import PyPDFLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.schema.runnable import RunnablePassthrough
-from langchain.prompts import PromptTemplate
-from langchain.schema.output_parser import StrOutputParser
-from langchain_community.vectorstores.utils import filter_complex_metadata
+import hashlib
+import os
+import threading
+import time
+from operator import itemgetter
+
+from langchain_core.prompts import PromptTemplate
+from langchain_core.output_parsers import StrOutputParser
 from langchain_core.messages.ai import AIMessage
 import prompts
+from EmbeddingService import EMBEDDING_MODEL, getEmbeddingService
+from DocumentIndex import INDEX_DIR, DocumentManifest, fingerprint
+from IngestionPipeline import IngestionPipeline, IngestionStats
+from StageTimer import StageTimingCallback
+from ContextPacker import RAG_CONTEXT_TOKENS, ContextPacker
+
+CHUNK_SIZE = 1024
+CHUNK_OVERLAP = 100
+# Vector store back-end: "chroma" (default) or "numpy"; the NumPy store keeps
+# its vectors as float32, float16 or int8.
+VECTOR_STORE = os.getenv("VECTOR_STORE", "chroma").lower()
+VECTOR_DTYPE = os.getenv("VECTOR_DTYPE", "float32").lower()
+
 
 class AIAgent:
 
-    def __init__(self, llm):
+    def __init__(self, llm, index_dir: str = INDEX_DIR):
         self.llm = llm
-        self.text_splitter = RecursiveCharacterTextSplitter(chunk_size=1024, chunk_overlap=100)
+        self.pipeline = IngestionPipeline(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+        # Merges overlapping chunks and bounds the context put in the prompt.
+        self.packer = ContextPacker(max_tokens=RAG_CONTEXT_TOKENS, max_overlap=CHUNK_OVERLAP)
         self.prompt = PromptTemplate.from_template(
             prompts.INSTRUCTIONS_WITH_CONTEXT
         )       
         self.vector_store = None
         self.retriever = None
         self.chain = None
-    
-    def ingestDocument(self, pdf_file_path: str):
-        docs = PyPDFLoader(file_path=pdf_file_path).load()
-        chunks = self.text_splitter.split_documents(docs)
-        chunks = filter_complex_metadata(chunks)
+        # Source path -> fingerprint / chunk ids of every indexed document.
+        self.manifest = DocumentManifest(index_dir)
+        # Serialises index writers (startup, background ingestion, clear);
+        # queries read the current store without taking it.
+        self._lock = threading.RLock()
 
-        vector_store = Chroma.from_documents(documents=chunks, embedding=FastEmbedEmbeddings())
-        self.retriever = vector_store.as_retriever(
+    def _createIndex(self):
+        with self._lock:
+            if self.chain is None:
+                self._openIndex()
+
+    def _openIndex(self):
+        if VECTOR_STORE == "numpy":
+            from NumpyVectorStore import NumpyVectorStore
+
+            self.vector_store = NumpyVectorStore(getEmbeddingService(EMBEDDING_MODEL),
+                                                 dtype=VECTOR_DTYPE,
+                                                 persist_directory=self.manifest.numpy_dir)
+        elif VECTOR_STORE == "chroma":
+            # The vector store (chromadb) is only imported once the index is used.
+            from langchain_community.vectorstores import Chroma
+
+            self.vector_store = Chroma(collection_name="rule-agent-documents",
+                                       embedding_function=getEmbeddingService(EMBEDDING_MODEL),
+                                       persist_directory=self.manifest.chroma_dir)
+        else:
+            raise ValueError(f"Valid options are chroma or numpy. Unsupported VECTOR_STORE '{VECTOR_STORE}'.")
+        self.retriever = self.vector_store.as_retriever(
             search_type="similarity_score_threshold",
             search_kwargs={
                 "k": 3,
@@ -50,16 +85,152 @@ class AIAgent:
             },
         )
         
-        self.chain = ({"context": self.retriever, "input": RunnablePassthrough()}
+        self.chain = ({"context": itemgetter("input") | self.retriever | self.packer.pack,
+                       "input": itemgetter("input")}
                       | self.prompt
                       | self.llm
                       ##| StrOutputParser()
         )
 
+    def _isIndexed(self, ids) -> bool:
+        return len(self.vector_store.get(ids=ids, include=[])["ids"]) == len(ids)
+
+    def ingestDocument(self, pdf_file_path: str):
+        """Add a single PDF to the index (see ingestDocuments)."""
+        return self.ingestDocuments([pdf_file_path])
+
+    def ingestDocuments(self, pdf_file_paths, stats: IngestionStats = None) -> IngestionStats:
+        """Add PDFs to the agent's persistent index.
+
+        All documents share one index, so retrieval spans the whole corpus.
+        A document whose fingerprint (content hash, chunking parameters and
+        embedding model) is already in the index is skipped; a changed one
+        replaces its previous chunks. New documents are extracted and split
+        in parallel and embedded in fixed-size batches. Each chunk records
+        its provenance (file, page, chunk number) in its metadata.
+
+        ``stats`` is updated while the documents are processed, so another
+        thread can report progress; queries keep using the index meanwhile.
+        """
+        stats = stats if stats is not None else IngestionStats()
+        pdf_file_paths = list(dict.fromkeys(pdf_file_paths))
+        if not pdf_file_paths:
+            return stats
+        with self._lock:
+            return self._ingest(pdf_file_paths, stats)
+
+    def _ingest(self, pdf_file_paths, stats):
+        start = time.perf_counter()
+        self._createIndex()
+
+        pending = {}  # source path -> fingerprint of the documents to parse
+        for path in pdf_file_paths:
+            fp = fingerprint(path, CHUNK_SIZE, CHUNK_OVERLAP, EMBEDDING_MODEL)
+            entry = self.manifest.get(path)
+            if entry is not None and entry["fingerprint"] == fp and self._isIndexed(entry["ids"]):
+                print("Already indexed:", path)
+                continue
+            chunks = self.manifest.load_chunks(fp)
+            if chunks is None:
+                pending[path] = fp
+                continue
+            # Same content was split before: re-embed the cached chunks, which
+            # may come from an identical copy stored under another path.
+            for c in chunks:
+                c.metadata.update(source=path, file=os.path.basename(path))
+            pages = len({c.metadata.get("page") for c in chunks})
+            stats.pages += pages
+            stats.chunks += len(chunks)
+            for i in range(0, len(chunks), self.pipeline.batch_size):
+                self._addChunks(chunks[i:i + self.pipeline.batch_size], {path: fp})
+                stats.embedded += len(chunks[i:i + self.pipeline.batch_size])
+                stats.batches += 1
+            self._commitDocument(path, fp, chunks, pages)
+            stats.documents += 1
+
+        def on_document(path, chunks, pages):
+            self.manifest.save_chunks(pending[path], chunks)
+            self._commitDocument(path, pending[path], chunks, pages)
+
+        self.pipeline.run(list(pending),
+                          on_batch=lambda batch: self._addChunks(batch, pending),
+                          on_document=on_document, stats=stats)
+        self._persist()
+        stats.seconds = time.perf_counter() - start
+        if stats.documents:
+            print("Ingested", stats)
+        return stats
+
+    def _persist(self):
+        # Chroma writes through; the NumPy store is saved explicitly.
+        if VECTOR_STORE == "numpy":
+            self.vector_store.persist()
+
+    @staticmethod
+    def _chunkId(path, fp, chunk):
+        # Unique per file and content, so identical copies do not share ids.
+        return f"{fp[:16]}-{hashlib.sha1(path.encode('utf-8')).hexdigest()[:8]}-{chunk}"
+
+    def _addChunks(self, chunks, fingerprints):
+        ids = [self._chunkId(c.metadata["source"], fingerprints[c.metadata["source"]], c.metadata["chunk"])
+               for c in chunks]
+        self.vector_store.add_documents(chunks, ids=ids)
+
+    def _commitDocument(self, path, fp, chunks, pages):
+        """Record a fully indexed document and drop the chunks it replaces."""
+        ids = [self._chunkId(path, fp, c.metadata["chunk"]) for c in chunks]
+        entry = self.manifest.get(path)
+        if entry is not None and entry["fingerprint"] != fp and entry["ids"]:
+            self.vector_store.delete(ids=entry["ids"])
+        self.manifest.set(path, fp, ids, pages)
+
+    def documents(self) -> list:
+        """Indexed documents with their page and chunk counts."""
+        return [{"source": source, "file": os.path.basename(source),
+                 "pages": entry["pages"], "chunks": len(entry["ids"])}
+                for source, entry in list(self.manifest.entries.items())]
+
+    def removeDocument(self, pdf_file_path: str) -> bool:
+        """Remove a single document from the index (see removeDocuments)."""
+        return self.removeDocuments([pdf_file_path]) == 1
+
+    def removeDocuments(self, pdf_file_paths, stats: IngestionStats = None) -> int:
+        """Delete the chunks of the given documents from the live index.
+
+        Only the documents' own chunk ids are deleted, so the rest of the
+        index stays in place and queries keep being served. To replace a
+        document, ingest the new version: its chunks are added before the
+        previous ones are dropped. Returns the number of documents removed.
+        """
+        removed = 0
+        with self._lock:
+            for source in dict.fromkeys(pdf_file_paths):
+                entry = self.manifest.remove(source)
+                if entry is None:
+                    continue
+                self._createIndex()
+                if entry["ids"]:
+                    self.vector_store.delete(ids=entry["ids"])
+                removed += 1
+                if stats is not None:
+                    stats.documents += 1
+                print("Removed from index:", source)
+            if removed:
+                self._persist()
+        return removed
+
+    def removeMissingDocuments(self):
+        """Drop indexed documents whose source file no longer exists."""
+        return self.removeDocuments([s for s in list(self.manifest.entries) if not os.path.exists(s)])
+
     def processMessage(self, userInput) -> str:
-        if not self.chain:
+        if not self.chain and self.manifest.entries:
+            self._createIndex()
+        chain = self.chain
+        if not chain:
             return "Please, add a PDF document first."
-        response = self.chain.invoke({'input': userInput})
+        response = chain.invoke({'input': userInput},
+                                     config={"callbacks": [StageTimingCallback()]})
         textResponse = ""    
 
         if (isinstance(response, AIMessage)):
@@ -71,6 +242,11 @@ class AIAgent:
         return '{ "input": "' + userInput.translate(translation_table) + '", "output": "' + textResponse.translate(translation_table) + '"}'
 
     def clear(self):
-        self.vector_store = None
-        self.retriever = None
-        self.chain = None
\ No newline at end of file
+        with self._lock:
+            if self.vector_store is not None:
+                self.vector_store.delete_collection()
+            for source in list(self.manifest.entries):
+                self.manifest.remove(source)
+            self.chain = None
+            self.retriever = None
+            self.vector_store = None
\ No newline at end of file
@@ -13,15 +13,22 @@
 """Flask front-end for the Rule-AI agent."""
 import os
 import json
-from flask import Flask, request
+import multiprocessing
+import threading
+import time
+from flask import Flask, Response, request
 from flask_cors import CORS
+from werkzeug.utils import secure_filename
 
 from CreateLLM import createLLM
+from LLMBatcher import LLMBatcher, batched_llm
 from RuleAIAgent import RuleAIAgent
 from AIAgent import AIAgent
+from IngestionJobs import REMOVE, IngestionQueue
 from ODMService import ODMService
 from ADSService import ADSService
 from Utils import find_descriptors
+from StageTimer import begin_request, current_stages, server_timing_header
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Configuration ─ default to IBM watsonx.ai if LLM_TYPE is missing
@@ -30,6 +37,10 @@ os.environ.setdefault("LLM_TYPE", "WATSONX")
 
 ROUTE = "/rule-agent"
 
+# Uploaded PDFs are stored in a "catalog" directory below DATADIR, so they are
+# picked up again like any other catalog document after a restart.
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", os.path.join(os.getenv("DATADIR", "../data"), "uploads", "catalog"))
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Create back-end services first (ADS ⭢ ODM). Must come before get_rule_services.
 # ─────────────────────────────────────────────────────────────────────────────
@@ -54,6 +65,10 @@ if llm is None:
         "createLLM() returned None – check environment variables required for "
         "the selected LLM_TYPE (currently '{}').".format(os.getenv("LLM_TYPE"))
     )
+# With LLM_BATCH_SIZE > 1 and a multi-prompt back-end, concurrent prompts of both
+# agents go to the LLM in micro-batches.
+llm = batched_llm(llm)
+llmBatcher = llm if isinstance(llm, LLMBatcher) else None
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Agents
@@ -69,18 +84,43 @@ CORS(app)
 app.config["CORS_HEADERS"] = "Content-Type"
 
 
-def _ingest_all_documents(directory_path: str) -> None:
-    """Load every PDF in *directory_path* into the RAG vector store."""
-    for filename in os.listdir(directory_path):
-        if filename.lower().endswith(".pdf"):
-            path = os.path.join(directory_path, filename)
-            print("Ingesting document:", path)
-            aiAgent.ingestDocument(path)
+def _find_catalog_documents() -> list:
+    """Return the PDFs of every catalog directory."""
+    paths = []
+    for directory_path in find_descriptors("catalog"):
+        for filename in sorted(os.listdir(directory_path)):
+            if filename.lower().endswith(".pdf"):
+                paths.append(os.path.join(directory_path, filename))
+    return paths
+
+
+# Pre-load any PDF catalog documents (unchanged ones are reused from the
+# persistent index) and forget documents that were removed from the catalogs.
+# Not in the ingestion workers, which re-import this module when it is run as
+# a script (python ChatService.py).
+if multiprocessing.parent_process() is None:
+    aiAgent.ingestDocuments(_find_catalog_documents())
+    aiAgent.removeMissingDocuments()
+
+# Uploads are ingested in the background while queries use the current index.
+ingestionQueue = IngestionQueue(aiAgent)
+
+# ───────────────────── Request timing ─────────────────────
+@app.before_request
+def _start_stage_timer():
+    begin_request()
+    request.environ["rule_agent.start"] = time.perf_counter()
 
 
-# Pre-load any PDF catalog documents
-for catalog_dir in find_descriptors("catalog"):
-    _ingest_all_documents(catalog_dir)
+@app.after_request
+def _add_server_timing(response):
+    stages = dict(current_stages() or {})
+    start = request.environ.get("rule_agent.start")
+    if start is not None:
+        stages["total"] = time.perf_counter() - start
+    response.headers["Server-Timing"] = server_timing_header(stages)
+    return response
+
 
 # ───────────────────── Flask routes ──────────────────────
 @app.route(ROUTE + "/chat_with_tools", methods=["GET"])
@@ -100,6 +140,166 @@ def chat_without_tools():
     return aiAgent.processMessage(user_input)
 
 
+@app.route(ROUTE + "/documents", methods=["POST"])
+def upload_documents():
+    """Store the uploaded PDFs and queue them for ingestion (202 + job id)."""
+    files = request.files.getlist("file")
+    if not files:
+        return {"output": "No file uploaded (use the 'file' form field)", "type": "error"}, 400
+
+    uploads = []
+    for upload in files:
+        filename = secure_filename(upload.filename or "")
+        if not filename.lower().endswith(".pdf"):
+            return {"output": f"Not a PDF document: {upload.filename}", "type": "error"}, 400
+        if upload.stream.read(5) != b"%PDF-":
+            return {"output": f"Not a PDF document: {upload.filename}", "type": "error"}, 400
+        upload.stream.seek(0)
+        uploads.append((filename, upload))
+
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    paths = []
+    for filename, upload in uploads:
+        path = os.path.join(UPLOAD_DIR, filename)
+        upload.save(path + ".part")
+        os.replace(path + ".part", path)
+        paths.append(path)
+
+    job = ingestionQueue.submit(paths)
+    print("Queued ingestion job", job.id, "for", ", ".join(os.path.basename(p) for p in paths))
+    return job.as_dict(), 202
+
+
+@app.route(ROUTE + "/documents", methods=["GET"])
+def list_documents():
+    return {"documents": aiAgent.documents()}
+
+
+@app.route(ROUTE + "/documents/<filename>", methods=["DELETE"])
+def delete_document(filename):
+    """Queue the removal of an indexed document (uploaded files are deleted too)."""
+    sources = [d["source"] for d in aiAgent.documents() if d["file"] == filename]
+    if not sources:
+        return {"output": f"Unknown document: {filename}", "type": "error"}, 404
+    if len(sources) > 1:
+        return {"output": f"Ambiguous document name: {filename}", "sources": sources, "type": "error"}, 409
+
+    source = sources[0]
+    uploaded = os.path.dirname(os.path.abspath(source)) == os.path.abspath(UPLOAD_DIR)
+    # The job deletes an uploaded file (otherwise it would come back with the catalog on
+    # restart) after any queued ingestion of it has run.
+    job = ingestionQueue.submit(sources, action=REMOVE, delete_files=sources if uploaded else ())
+    return job.as_dict(), 202
+
+
+@app.route(ROUTE + "/documents/jobs", methods=["GET"])
+def list_ingestion_jobs():
+    return {"jobs": ingestionQueue.jobs()}
+
+
+@app.route(ROUTE + "/documents/jobs/<job_id>", methods=["GET"])
+def ingestion_job_status(job_id):
+    status = ingestionQueue.status(job_id)
+    if status is None:
+        return {"output": f"Unknown ingestion job: {job_id}", "type": "error"}, 404
+    return status
+
+
+@app.route(ROUTE + "/llm/metrics", methods=["GET"])
+def llm_metrics():
+    if llmBatcher is None:
+        return {"batching": False}
+    return dict(llmBatcher.metrics.as_dict(), batching=True,
+                max_batch_size=llmBatcher.max_batch_size, window_ms=llmBatcher.max_delay * 1000.0)
+
+
+# ───────────────────── Ontology queries ──────────────────────
+_ontologyHolder = None
+_ontologyLock = threading.Lock()
+
+
+def ontology_holder():
+    """The OntologyHolder of the rule agent (loaded on first use outside advanced mode)."""
+    global _ontologyHolder
+    holder = getattr(ruleAIAgent, "ontology_holder", None)
+    if holder is None:
+        with _ontologyLock:
+            if _ontologyHolder is None:
+                from neuro_symbolic.ontology_engine import OntologyHolder, load_ontology
+                _ontologyHolder = OntologyHolder(load_ontology())
+        holder = _ontologyHolder
+    return holder
+
+
+def current_ontology():
+    """The ontology served by the rule agent."""
+    return ontology_holder().current
+
+
+@app.route(ROUTE + "/ontology", methods=["GET"])
+def ontology_status():
+    return ontology_holder().status()
+
+
+@app.route(ROUTE + "/ontology/reclassify", methods=["POST"])
+def reclassify_ontology():
+    """
+    Re-classify the ontology in the background and swap in the result (202). An OWL file
+    (RDF/XML) in the 'file' form field replaces the asserted ontology; without one, the
+    current ontology is re-classified. Queries use the current ontology meanwhile.
+    """
+    from owlready2 import World
+    from neuro_symbolic.ontology_engine import ONTOLOGY_IRI
+
+    holder = ontology_holder()
+    upload = request.files.get("file")
+    onto = None
+    if upload is not None:
+        try:
+            onto = World().get_ontology(ONTOLOGY_IRI).load(fileobj=upload.stream)
+        except Exception as exc:  # noqa: BLE001
+            return {"output": f"Invalid ontology file: {exc}", "type": "error"}, 400
+    holder.reclassify(onto)
+    print("Queued ontology re-classification" + (f" of {upload.filename}" if upload is not None else ""))
+    return holder.status(), 202
+
+
+@app.route(ROUTE + "/sparql", methods=["GET", "POST"])
+def sparql():
+    """
+    Read-only SPARQL over the ontology. Parameters: query, params (JSON list bound to
+    ??1, ??2, ...; entity names are bound to the entities) and limit. Rows are streamed.
+    """
+    from neuro_symbolic.sparql_queries import (
+        SPARQL_MAX_ROWS, bind_parameters, query_columns, sparql_query, to_json_value,
+    )
+
+    args = (request.get_json(silent=True) or {}) if request.method == "POST" else request.args
+    query = args.get("query", "")
+    try:
+        params = args.get("params") or []
+        if isinstance(params, str):
+            params = json.loads(params)
+        if not isinstance(params, list):
+            raise ValueError("params must be a JSON list.")
+        limit = args.get("limit")
+        limit = SPARQL_MAX_ROWS if limit in (None, "") else min(int(limit), SPARQL_MAX_ROWS)
+        onto = current_ontology()
+        # Prepared, validated and executed before the response starts: errors are 400s.
+        columns = query_columns(onto, query)
+        rows = sparql_query(onto, query, bind_parameters(onto, params), limit=limit)
+    except Exception as exc:  # noqa: BLE001
+        return {"output": f"Invalid SPARQL query: {exc}", "type": "error"}, 400
+
+    def generate():
+        yield '{"columns": ' + json.dumps(columns) + ', "rows": ['
+        for i, row in enumerate(rows):
+            yield ("," if i else "") + json.dumps([to_json_value(v) for v in row])
+        yield "]}"
+
+    return Response(generate(), mimetype="application/json")
+
+
 print("✅  Chat service is ready on route", ROUTE)
 
 if __name__ == "__main__":
@@ -0,0 +1,133 @@
+#
+#    Copyright 2024 IBM Corp.
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#        http://www.apache.org/licenses/LICENSE-2.0
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+#
+"""Assemble retrieved chunks into a compact, token-bounded prompt context.
+
+Consecutive chunks of the same document are merged back into one passage,
+dropping the text the splitter repeated between them (``chunk_overlap``).
+Duplicate passages (e.g. identical copies of a document) are kept once, and
+passages are added by relevance until $RAG_CONTEXT_TOKENS is reached.
+Tokens are estimated at ~4 characters each, which is close enough for
+budgeting without loading the model's tokenizer.
+"""
+from __future__ import annotations
+
+import os
+import re
+from typing import List
+
+from langchain_core.documents import Document
+
+RAG_CONTEXT_TOKENS = int(os.getenv("RAG_CONTEXT_TOKENS", "1500"))
+CHARS_PER_TOKEN = 4
+# Shorter suffix/prefix matches are only overlap if they are whole words
+# (the splitter overlaps on separators); otherwise they are coincidences.
+MIN_OVERLAP = 16
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _whole_words(left: str, right: str, size: int) -> bool:
+    return ((size == len(left) or left[-size - 1].isspace())
+            and (size == len(right) or right[size].isspace()))
+
+
+def _overlap(left: str, right: str, max_overlap: int) -> int:
+    """Length of the longest suffix of *left* that is a prefix of *right*."""
+    for size in range(min(max_overlap, len(left), len(right)), 0, -1):
+        if left.endswith(right[:size]) and (size >= MIN_OVERLAP or _whole_words(left, right, size)):
+            return size
+    return 0
+
+
+class _Passage:
+    def __init__(self, doc: Document, rank: int):
+        self.text = doc.page_content.strip()
+        self.rank = rank
+        self.file = doc.metadata.get("file") or os.path.basename(str(doc.metadata.get("source", "")))
+        self.pages = {doc.metadata["page"]} if "page" in doc.metadata else set()
+
+    def extend(self, doc: Document, rank: int, max_overlap: int) -> None:
+        text = doc.page_content.strip()
+        size = _overlap(self.text, text, max_overlap)
+        self.text = self.text + text[size:] if size else self.text + " " + text
+        self.rank = min(self.rank, rank)
+        if "page" in doc.metadata:
+            self.pages.add(doc.metadata["page"])
+
+    def header(self) -> str:
+        if not self.pages:
+            return f"[{self.file}]"
+        first, last = min(self.pages) + 1, max(self.pages) + 1
+        return f"[{self.file}, page {first}]" if first == last else f"[{self.file}, pages {first}-{last}]"
+
+
+class ContextPacker:
+    """Turn a relevance-ordered list of chunks into the prompt context."""
+
+    def __init__(self, max_tokens: int = RAG_CONTEXT_TOKENS, max_overlap: int = 100):
+        self.max_tokens = max_tokens
+        self.max_overlap = max_overlap
+
+    def passages(self, docs: List[Document]) -> List[_Passage]:
+        """Merged, de-duplicated passages, most relevant first."""
+        seen, unique = set(), []
+        for rank, doc in enumerate(docs):
+            key = _normalize(doc.page_content)
+            if key and key not in seen:
+                seen.add(key)
+                unique.append((rank, doc))
+
+        # Merge runs of consecutive chunks of the same document.
+        ordered = sorted(unique, key=lambda rd: (str(rd[1].metadata.get("source", "")),
+                                                 rd[1].metadata.get("chunk", -1), rd[0]))
+        passages, previous = [], None
+        for rank, doc in ordered:
+            chunk = doc.metadata.get("chunk")
+            if (previous is not None and chunk is not None and previous.metadata.get("chunk") is not None
+                    and previous.metadata.get("source") == doc.metadata.get("source")
+                    and chunk == previous.metadata["chunk"] + 1):
+                passages[-1].extend(doc, rank, self.max_overlap)
+            else:
+                passages.append(_Passage(doc, rank))
+            previous = doc
+
+        # Drop passages whose text is already contained in a more relevant one.
+        passages.sort(key=lambda p: p.rank)
+        kept = []
+        for passage in passages:
+            text = _normalize(passage.text)
+            if not any(text in _normalize(other.text) for other in kept):
+                kept.append(passage)
+        return kept
+
+    def pack(self, docs: List[Document]) -> str:
+        budget = self.max_tokens
+        sections = []
+        for passage in self.passages(docs):
+            section = passage.header() + "\n" + passage.text
+            cost = estimate_tokens(section) + 1
+            if cost > budget:
+                if not sections:
+                    # Even the best passage is too long: keep its beginning.
+                    sections.append(section[:budget * CHARS_PER_TOKEN])
+                    break
+                continue
+            sections.append(section)
+            budget -= cost
+        return "\n\n".join(sections)
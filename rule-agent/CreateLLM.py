@@ -13,10 +13,6 @@
 """Factory that returns an LLM instance based on $LLM_TYPE."""
 import os
 
-from CreateLLMLocal import createLLMLocal
-from CreateLLMWatson import createLLMWatson
-from CreateLLMBAM    import createLLMBAM
-
 
 def createLLM():
     """Return a langchain *Runnable* LLM according to $LLM_TYPE.
@@ -26,19 +22,24 @@ def createLLM():
       * WATSONX  – IBM watsonx.ai (default)
       * LOCAL_OLLAMA – local Ollama server
       * BAM      – IBM Granite/BAM service
+
+    Each back-end module (and its client SDK) is imported only when selected.
     """
     llm_type = os.getenv("LLM_TYPE", "WATSONX")
 
     if llm_type == "WATSONX":
         print("Using LLM Service: IBM watsonx.ai")
+        from CreateLLMWatson import createLLMWatson
         return createLLMWatson()
 
     if llm_type == "LOCAL_OLLAMA":
         print("Using LLM Service: Ollama")
+        from CreateLLMLocal import createLLMLocal
         return createLLMLocal()
 
     if llm_type == "BAM":
         print("Using LLM Service: IBM BAM")
+        from CreateLLMBAM import createLLMBAM
         return createLLMBAM()
 
     # Any other value is invalid – fail fast.
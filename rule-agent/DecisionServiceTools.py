@@ -19,22 +19,11 @@ from typing import List
 
 from langchain_core.tools import tool
 from langchain_core.tools import BaseTool
-from langchain_community.llms import Ollama
 from langchain_core.pydantic_v1 import BaseModel
 from Utils import find_descriptors
 
 from RuleService import RuleService
 
-# Import neuro symbolic evaluation routine if available.
-# This function is assumed to exist in the neuro_symbolic.evaluation module.
-try:
-    from neuro_symbolic.evaluation import evaluate_decision_logic
-except ImportError:
-    # If the module does not exist or cannot be imported, define a stub.
-    def evaluate_decision_logic(rulesetPath, decisionInputs):
-        print("Neuro Symbolic evaluation not available; falling back to standard decision logic.")
-        return None
-
 class ToolDescriptor(BaseModel):
     engine: str
     toolName: str
@@ -77,22 +66,15 @@ class GenericDecisionServiceTool(BaseTool):
     toolPath: str
     outputProperty: str
     executionService: RuleService
-    # New attribute to control use of Neuro Symbolic evaluation
-    use_neuro_symbolic: bool = False
 
     def _run(self, **kwargs) -> str:
         """Use the tool."""
         print("Use Decision Service: " + self.name + " with ", kwargs)
-        
-        if self.use_neuro_symbolic:
-            # Invoke the Neuro Symbolic evaluation routine.
-            decisionOutput = evaluate_decision_logic(rulesetPath=self.toolPath, decisionInputs=kwargs)
-            print("Neuro Symbolic evaluation responded: ", decisionOutput)
-        else:
-            # Fallback to the standard decision service invocation.
-            decisionOutput = self.executionService.invokeDecisionService(rulesetPath=self.toolPath, decisionInputs=kwargs)
-            print("Decision service responded: ", decisionOutput)
-        
+        # Decisions always come from the decision service; the neuro-symbolic mode
+        # (USE_NEURO_SYMBOLIC) reasons over the ontology in RuleAIAgent instead.
+        decisionOutput = self.executionService.invokeDecisionService(rulesetPath=self.toolPath, decisionInputs=kwargs)
+        print("Decision service responded: ", decisionOutput)
+
         if decisionOutput is not None:
             return decisionOutput[self.outputProperty]
         return None
@@ -104,12 +86,8 @@ class GenericDecisionServiceTool(BaseTool):
 def initializeTools(ruleServices):
     """
     Initialize decision service tools based on JSON descriptors.
-    Additionally, check for an environment variable 'USE_NEURO_SYMBOLIC'
-    to optionally enable Neuro Symbolic evaluation routines for each tool.
     """
     res = []
-    # Check an environment variable for neuro symbolic usage (default disabled)
-    use_neuro_flag = os.getenv("USE_NEURO_SYMBOLIC", "0") == "1"
 
     tool_descriptors_dirs = find_descriptors('tool_descriptors')
     # For each directory containing tool descriptors:
@@ -123,7 +101,5 @@ def initializeTools(ruleServices):
                 toolPath=t.toolPath,
                 outputProperty=t.output
             )
-            # Set the neuro symbolic option according to the environment flag.
-            tool_instance.use_neuro_symbolic = use_neuro_flag
             res.append(tool_instance)
     return res
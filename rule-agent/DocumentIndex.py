@@ -0,0 +1,120 @@
+#
+#    Copyright 2024 IBM Corp.
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#        http://www.apache.org/licenses/LICENSE-2.0
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+#
+"""On-disk bookkeeping for the persistent RAG index.
+
+The index directory ($RAG_INDEX_DIR, default ``.rag_index``) holds:
+
+  * ``chroma/`` or ``numpy/`` – the persisted vector store
+  * ``chunks/<fp>.json`` – extracted and chunked text of each document
+  * ``manifest.json``  – source path -> fingerprint, chunk ids and page count
+
+A document's fingerprint hashes its bytes together with the chunking
+parameters and the embedding model, so a restart only re-embeds files whose
+content or indexing configuration changed.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional
+
+from langchain_core.documents import Document
+
+from Utils import logger
+
+INDEX_DIR = os.getenv("RAG_INDEX_DIR", ".rag_index")
+MANIFEST_FILE = "manifest.json"
+
+
+def fingerprint(path: str, *params) -> str:
+    """SHA-256 of the file content and the indexing parameters."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    digest.update(json.dumps([str(p) for p in params]).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _write_json(path: str, data) -> None:
+    """Write *data* atomically (temporary file + rename)."""
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+class DocumentManifest:
+    """Manifest of the documents stored in a persistent index directory."""
+
+    def __init__(self, index_dir: str = INDEX_DIR):
+        self.index_dir = index_dir
+        self.chroma_dir = os.path.join(index_dir, "chroma")
+        self.numpy_dir = os.path.join(index_dir, "numpy")
+        self.chunks_dir = os.path.join(index_dir, "chunks")
+        self.path = os.path.join(index_dir, MANIFEST_FILE)
+        os.makedirs(self.chunks_dir, exist_ok=True)
+        self.entries: Dict[str, dict] = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except ValueError:
+                logger.warning("Ignoring unreadable RAG manifest: %s", self.path)
+
+    def get(self, source: str) -> Optional[dict]:
+        return self.entries.get(source)
+
+    def set(self, source: str, fp: str, ids: List[str], pages: int) -> None:
+        previous = self.entries.get(source)
+        self.entries[source] = {"fingerprint": fp, "ids": ids, "pages": pages}
+        self.save()
+        if previous is not None and previous["fingerprint"] != fp:
+            # The document changed: the chunks of its previous content go too.
+            self._remove_unused_chunks(previous["fingerprint"])
+
+    def remove(self, source: str) -> Optional[dict]:
+        entry = self.entries.pop(source, None)
+        if entry is not None:
+            self.save()
+            self._remove_unused_chunks(entry["fingerprint"])
+        return entry
+
+    def _remove_unused_chunks(self, fp: str) -> None:
+        # Identical copies under other paths share the cached chunks.
+        if not any(e["fingerprint"] == fp for e in self.entries.values()):
+            self.remove_chunks(fp)
+
+    def save(self) -> None:
+        _write_json(self.path, self.entries)
+
+    # ------------------------------------------------------------- chunk cache
+    def _chunks_path(self, fp: str) -> str:
+        return os.path.join(self.chunks_dir, fp + ".json")
+
+    def save_chunks(self, fp: str, chunks: List[Document]) -> None:
+        _write_json(self._chunks_path(fp),
+                    [{"text": c.page_content, "metadata": c.metadata} for c in chunks])
+
+    def load_chunks(self, fp: str) -> Optional[List[Document]]:
+        path = self._chunks_path(fp)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return [Document(page_content=c["text"], metadata=c["metadata"]) for c in json.load(f)]
+
+    def remove_chunks(self, fp: str) -> None:
+        path = self._chunks_path(fp)
+        if os.path.exists(path):
+            os.remove(path)
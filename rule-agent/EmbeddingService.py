@@ -0,0 +1,101 @@
+#
+#    Copyright 2024 IBM Corp.
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#        http://www.apache.org/licenses/LICENSE-2.0
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+#
+"""Process-wide embedding service.
+
+``getEmbeddingService()`` returns one shared ``Embeddings`` per model name.
+The FastEmbed ONNX model is loaded once, on first use; documents are embedded
+in batches of $EMBED_BATCH_SIZE and query embeddings are kept in an LRU cache
+of $EMBEDDING_CACHE_SIZE entries, so repeated questions are not re-embedded.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List
+
+from langchain_core.embeddings import Embeddings
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "BAAI/bge-small-en-v1.5")
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "256"))
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "1024"))
+
+
+class EmbeddingService(Embeddings):
+    """FastEmbed embeddings with lazy model loading and a query cache."""
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL, batch_size: int = EMBED_BATCH_SIZE,
+                 cache_size: int = EMBEDDING_CACHE_SIZE):
+        self.model_name = model_name
+        self.batch_size = max(1, batch_size)
+        self.cache_size = cache_size
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    from langchain_community.embeddings import FastEmbedEmbeddings
+                    self._model = FastEmbedEmbeddings(model_name=self.model_name)
+        return self._model
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors: List[List[float]] = []
+        for i in range(0, len(texts), self.batch_size):
+            vectors += self.model.embed_documents(texts[i:i + self.batch_size])
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        with self._cache_lock:
+            cached = self._cache.get(text)
+            if cached is not None:
+                self._cache.move_to_end(text)
+                self.hits += 1
+                return list(cached)
+            self.misses += 1
+        vector = self.model.embed_query(text)
+        if self.cache_size > 0:
+            with self._cache_lock:
+                self._cache[text] = tuple(vector)
+                self._cache.move_to_end(text)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return vector
+
+    def cache_info(self) -> dict:
+        with self._cache_lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "size": len(self._cache), "max_size": self.cache_size}
+
+    def clear_cache(self) -> None:
+        with self._cache_lock:
+            self._cache.clear()
+
+
+_services: Dict[str, EmbeddingService] = {}
+_services_lock = threading.Lock()
+
+
+def getEmbeddingService(model_name: str = EMBEDDING_MODEL) -> EmbeddingService:
+    """Return the process-wide embedding service for *model_name*."""
+    with _services_lock:
+        service = _services.get(model_name)
+        if service is None:
+            service = _services[model_name] = EmbeddingService(model_name)
+        return service
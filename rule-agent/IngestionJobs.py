@@ -0,0 +1,151 @@
+#
+#    Copyright 2024 IBM Corp.
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#        http://www.apache.org/licenses/LICENSE-2.0
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+#
+"""Background ingestion of uploaded documents.
+
+``IngestionQueue.submit(paths)`` returns an ``IngestionJob`` immediately; a
+single worker thread feeds the queued jobs to ``AIAgent.ingestDocuments`` one
+after the other.  ``submit(paths, action=REMOVE)`` queues the removal of
+documents from the index the same way, so writes never overlap; files passed as
+``delete_files`` are deleted by the job once their documents are removed.  The job's
+``IngestionStats`` is updated while it runs, so ``status()`` reports parsed
+pages and embedded chunks as they progress.
+The last $INGEST_JOB_HISTORY finished jobs are kept for status queries.
+"""
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from typing import List, Optional
+
+from IngestionPipeline import IngestionStats
+
+JOB_HISTORY = int(os.getenv("INGEST_JOB_HISTORY", "100"))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+INGEST, REMOVE = "ingest", "remove"
+
+
+def _file_identity(path: str) -> Optional[tuple]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns
+
+
+class IngestionJob:
+    """One upload or removal: the documents concerned and the progress."""
+
+    def __init__(self, paths: List[str], action: str = INGEST, delete_files: List[str] = ()):
+        self.id = uuid.uuid4().hex
+        self.paths = list(paths)
+        self.action = action
+        # Identity at submission: a file uploaded again meanwhile is not deleted.
+        self.delete_files = {p: _file_identity(p) for p in delete_files}
+        self.status = QUEUED
+        self.error: Optional[str] = None
+        self.stats = IngestionStats()
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    def as_dict(self) -> dict:
+        stats = self.stats
+        return {
+            "job": self.id,
+            "action": self.action,
+            "status": self.status,
+            "files": [os.path.basename(p) for p in self.paths],
+            "documents": stats.documents,
+            "pages": stats.pages,
+            "chunks": stats.chunks,
+            "embedded": stats.embedded,
+            "done": self.status in (DONE, FAILED),
+            "error": self.error,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+        }
+
+
+class IngestionQueue:
+    """FIFO of ingestion jobs processed by one background thread."""
+
+    def __init__(self, agent, history: int = JOB_HISTORY):
+        self.agent = agent
+        self.history = history
+        self._queue: "queue.Queue[IngestionJob]" = queue.Queue()
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+
+    def submit(self, paths: List[str], action: str = INGEST, delete_files: List[str] = ()) -> IngestionJob:
+        if action not in (INGEST, REMOVE):
+            raise ValueError(f"Valid options are {INGEST} or {REMOVE}. Unsupported action '{action}'.")
+        job = IngestionJob(paths, action, delete_files)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._trim()
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="ingestion-worker", daemon=True)
+                self._worker.start()
+        self._queue.put(job)
+        return job
+
+    def status(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job.as_dict() if job is not None else None
+
+    def jobs(self) -> List[dict]:
+        with self._lock:
+            return [job.as_dict() for job in self._jobs.values()]
+
+    def _trim(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in (DONE, FAILED)]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            job.status, job.started = RUNNING, time.time()
+            try:
+                if job.action == REMOVE:
+                    self.agent.removeDocuments(job.paths, stats=job.stats)
+                    self._delete_files(job)
+                else:
+                    self.agent.ingestDocuments(job.paths, stats=job.stats)
+                job.status = DONE
+            except Exception as e:
+                traceback.print_exc()
+                job.status, job.error = FAILED, str(e)
+            job.finished = time.time()
+            print(f"Ingestion job {job.id} ({job.action}) {job.status}: {job.stats}")
+            with self._lock:
+                self._trim()
+
+    @staticmethod
+    def _delete_files(job: IngestionJob) -> None:
+        for path, identity in job.delete_files.items():
+            if identity is None or _file_identity(path) != identity:
+                continue  # Already gone, or replaced by a new upload.
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
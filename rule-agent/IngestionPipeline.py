@@ -0,0 +1,193 @@
+#
+#    Copyright 2024 IBM Corp.
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#        http://www.apache.org/licenses/LICENSE-2.0
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+#
+"""Parallel PDF extraction and splitting feeding fixed-size embedding batches.
+
+PDFs are cut into page ranges that worker processes extract (pypdf) and split
+(``RecursiveCharacterTextSplitter``).  Results are consumed in order and the
+chunks are streamed into batches of ``batch_size`` for the embedding step, so
+the embedding model always sees large batches regardless of document sizes.
+
+Configuration: $INGEST_WORKERS (default: CPU count), $EMBED_BATCH_SIZE
+(default 256) and $INGEST_PAGES_PER_TASK (default 8).
+"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from EmbeddingService import EMBED_BATCH_SIZE
+
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", str(os.cpu_count() or 1)))
+PAGES_PER_TASK = int(os.getenv("INGEST_PAGES_PER_TASK", "8"))
+
+Task = Tuple[str, int, int, int, int]
+
+
+def _extract_pages(task: Task) -> Tuple[str, int, List[Tuple[str, dict]]]:
+    """Extract and split pages ``[first, last)`` of a PDF (runs in a worker)."""
+    from pypdf import PdfReader
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    path, first, last, chunk_size, chunk_overlap = task
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    reader = PdfReader(path)
+    file_name = os.path.basename(path)
+    chunks = []
+    for page_number in range(first, last):
+        text = reader.pages[page_number].extract_text()
+        for piece in splitter.split_text(text):
+            chunks.append((piece, {"source": path, "file": file_name, "page": page_number}))
+    return path, last - first, chunks
+
+
+def _page_count(path: str) -> int:
+    from pypdf import PdfReader
+    return len(PdfReader(path).pages)
+
+
+class IngestionStats:
+    """Counters of one pipeline run."""
+
+    def __init__(self):
+        self.documents = 0
+        self.pages = 0
+        self.chunks = 0
+        self.embedded = 0
+        self.batches = 0
+        self.seconds = 0.0
+
+    def as_dict(self) -> dict:
+        seconds = self.seconds or float("inf")
+        return {
+            "documents": self.documents,
+            "pages": self.pages,
+            "chunks": self.chunks,
+            "embedded": self.embedded,
+            "batches": self.batches,
+            "seconds": round(self.seconds, 3),
+            "pages_per_sec": round(self.pages / seconds, 1),
+            "chunks_per_sec": round(self.chunks / seconds, 1),
+        }
+
+    def __str__(self):
+        d = self.as_dict()
+        return (f"{d['documents']} documents, {d['pages']} pages, {d['chunks']} chunks "
+                f"in {d['seconds']}s ({d['pages_per_sec']} pages/s, "
+                f"{d['chunks_per_sec']} chunks/s)")
+
+
+class IngestionPipeline:
+    """Extract/split PDFs in a process pool and stream chunks in batches.
+
+    ``run`` calls ``on_batch(chunks)`` with at most ``batch_size`` chunks at a
+    time, then ``on_document(path, chunks, pages)`` once all chunks of a
+    document have been passed to ``on_batch``.  Chunk metadata carries
+    ``source``, ``file``, ``page`` and the chunk number within the document.
+    A caller-supplied ``stats`` is updated as pages are parsed and batches
+    embedded, so it can be polled for progress while ``run`` is in flight.
+    """
+
+    def __init__(self, chunk_size: int, chunk_overlap: int, workers: int = INGEST_WORKERS,
+                 batch_size: int = EMBED_BATCH_SIZE, pages_per_task: int = PAGES_PER_TASK):
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.pages_per_task = max(1, pages_per_task)
+
+    def _tasks(self, paths: Iterable[str]) -> Tuple[List[Task], Dict[str, int]]:
+        tasks, task_counts = [], {}
+        for path in paths:
+            pages = _page_count(path)
+            ranges = [(first, min(first + self.pages_per_task, pages))
+                      for first in range(0, pages, self.pages_per_task)]
+            task_counts[path] = len(ranges)
+            tasks += [(path, first, last, self.chunk_size, self.chunk_overlap) for first, last in ranges]
+        return tasks, task_counts
+
+    def run(self, paths: Iterable[str],
+            on_batch: Callable[[List[Document]], None],
+            on_document: Callable[[str, List[Document], int], None],
+            stats: Optional[IngestionStats] = None) -> IngestionStats:
+        stats = stats if stats is not None else IngestionStats()
+        start = time.perf_counter()
+        tasks, task_counts = self._tasks(paths)
+
+        buffer: List[Document] = []
+        flushed = 0          # chunks handed to on_batch so far
+        enqueued = 0         # chunks appended to the buffer so far
+        waiting = []         # (end position, path, chunks, pages) not yet fully flushed
+
+        def flush(force: bool) -> None:
+            nonlocal buffer, flushed
+            while len(buffer) >= self.batch_size or (force and buffer):
+                batch, buffer = buffer[:self.batch_size], buffer[self.batch_size:]
+                on_batch(batch)
+                flushed += len(batch)
+                stats.embedded += len(batch)
+                stats.batches += 1
+            while waiting and waiting[0][0] <= flushed:
+                _, path, chunks, pages = waiting.pop(0)
+                on_document(path, chunks, pages)
+                stats.documents += 1
+
+        # Documents without pages have no task; they are complete right away.
+        waiting += [(0, path, [], 0) for path, count in task_counts.items() if count == 0]
+
+        current, parts, pages = None, [], 0
+        for path, page_count, chunks in self._map(tasks):
+            if path != current:
+                current, parts, pages = path, [], 0
+            parts += chunks
+            pages += page_count
+            stats.pages += page_count
+            task_counts[path] -= 1
+            if task_counts[path] == 0:
+                documents = [Document(page_content=text, metadata=dict(metadata, chunk=i))
+                             for i, (text, metadata) in enumerate(parts)]
+                buffer += documents
+                enqueued += len(documents)
+                waiting.append((enqueued, path, documents, pages))
+                stats.chunks += len(documents)
+                flush(force=False)
+        flush(force=True)
+
+        stats.seconds = time.perf_counter() - start
+        return stats
+
+    def _map(self, tasks: List[Task]):
+        """Run the extraction tasks, yielding results in task order."""
+        if self.workers == 1 or len(tasks) <= 1:
+            for task in tasks:
+                yield _extract_pages(task)
+            return
+        context = multiprocessing.get_context("spawn")
+        done = 0
+        try:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(tasks)), mp_context=context) as pool:
+                for result in pool.map(_extract_pages, tasks):
+                    done += 1
+                    yield result
+            return
+        except BrokenProcessPool:
+            # Spawned workers re-import the main module: a script that ingests at
+            # import time without a __main__ guard kills them.  Finish in process.
+            print("Ingestion workers could not start, extracting in process")
+        for task in tasks[done:]:
+            yield _extract_pages(task)
@@ -0,0 +1,245 @@
+#
+#    Copyright 2024 IBM Corp.
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#        http://www.apache.org/licenses/LICENSE-2.0
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+#
+"""Micro-batching of concurrent LLM calls.
+
+:class:`LLMBatcher` wraps the LLM returned by ``createLLM()`` and can be used
+wherever it is (it is a LangChain ``Runnable``).  Prompts that arrive within
+``LLM_BATCH_WINDOW_MS`` of each other, up to ``LLM_BATCH_SIZE``, are sent to
+the LLM as one ``batch()`` call; each caller gets its own result back.  Up to
+``LLM_BATCH_IN_FLIGHT`` batches run at the same time.
+
+Batching only pays off for back-ends whose ``generate`` sends all the prompts
+of a batch in one request (``MULTI_PROMPT_BACKENDS``, e.g. watsonx.ai's
+``WatsonxLLM``).  LangChain's ``Ollama`` generates the prompts one after
+another and chat models (``ChatWatsonx``) already run them concurrently, so
+:func:`batched_llm` leaves those unwrapped.  Batching is off by default
+(``LLM_BATCH_SIZE=1``).
+
+The time a prompt waits for its batch is reported as the ``llm_queue`` stage
+of the request (Server-Timing), and batch sizes and queueing delays are kept
+in :attr:`LLMBatcher.metrics`.
+"""
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Optional
+
+from langchain_core.runnables import Runnable, RunnableConfig
+from langchain_core.runnables.config import get_config_list
+
+from StageTimer import current_stages, record
+
+LLM_BATCH_SIZE = int(os.getenv("LLM_BATCH_SIZE", "1"))
+LLM_BATCH_WINDOW_MS = float(os.getenv("LLM_BATCH_WINDOW_MS", "20"))
+LLM_BATCH_IN_FLIGHT = int(os.getenv("LLM_BATCH_IN_FLIGHT", "4"))
+
+# LLM classes whose generate() sends a list of prompts in a single request.
+MULTI_PROMPT_BACKENDS = ("WatsonxLLM",)
+
+
+class BatchMetrics:
+    """Batch sizes and queueing delays of an LLMBatcher."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.prompts = 0
+        self.errors = 0
+        self.batch_sizes: dict[int, int] = {}
+        self.queue_seconds = 0.0
+        self.max_queue_seconds = 0.0
+        self.generate_seconds = 0.0
+
+    def add(self, size: int, delays: List[float], seconds: float, failed: int) -> None:
+        with self._lock:
+            self.batches += 1
+            self.prompts += size
+            self.errors += failed
+            self.batch_sizes[size] = self.batch_sizes.get(size, 0) + 1
+            self.queue_seconds += sum(delays)
+            self.max_queue_seconds = max([self.max_queue_seconds] + delays)
+            self.generate_seconds += seconds
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            batches = self.batches or 1
+            prompts = self.prompts or 1
+            return {
+                "batches": self.batches,
+                "prompts": self.prompts,
+                "errors": self.errors,
+                "mean_batch_size": round(self.prompts / batches, 2),
+                "batch_sizes": dict(sorted(self.batch_sizes.items())),
+                "mean_queue_ms": round(self.queue_seconds / prompts * 1000.0, 3),
+                "max_queue_ms": round(self.max_queue_seconds * 1000.0, 3),
+                "mean_generate_ms": round(self.generate_seconds / batches * 1000.0, 3),
+            }
+
+
+class _Request:
+    def __init__(self, input: Any, config: Optional[RunnableConfig]) -> None:
+        self.input = input
+        self.config = config or {}
+        self.queued = time.perf_counter()
+        self.delay = 0.0
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class LLMBatcher(Runnable):
+    """Runnable that sends concurrent prompts to the wrapped LLM in batches."""
+
+    def __init__(
+        self,
+        llm: Runnable,
+        max_batch_size: int = LLM_BATCH_SIZE,
+        max_delay_ms: float = LLM_BATCH_WINDOW_MS,
+        max_in_flight: int = LLM_BATCH_IN_FLIGHT,
+    ) -> None:
+        self.llm = llm
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_delay = max_delay_ms / 1000.0
+        self.max_in_flight = max(1, max_in_flight)
+        self.metrics = BatchMetrics()
+        self._queue: queue.Queue[_Request] = queue.Queue()
+        # The dispatcher takes a slot before collecting a batch: while all are busy,
+        # new prompts accumulate into the next batch instead of waiting one by one.
+        self._slots = threading.Semaphore(self.max_in_flight)
+        self._executor = ThreadPoolExecutor(self.max_in_flight, thread_name_prefix="llm-batch")
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="llm-batcher", daemon=True)
+                self._worker.start()
+
+    def _submit(self, input: Any, config: Optional[RunnableConfig]) -> _Request:
+        request = _Request(input, config)
+        self._ensure_worker()
+        self._queue.put(request)
+        return request
+
+    def _wait(self, request: _Request) -> Any:
+        request.done.wait()
+        record("llm_queue", request.delay, current_stages())
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    # ------------------------------------------------------------------ Runnable
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        return self._wait(self._submit(input, config))
+
+    def batch(
+        self,
+        inputs: List[Any],
+        config: Optional[RunnableConfig | List[RunnableConfig]] = None,
+        *,
+        return_exceptions: bool = False,
+        **kwargs: Any,
+    ) -> List[Any]:
+        if not inputs:
+            return []
+        # One config per input, as in Runnable.batch (ValueError on a length mismatch).
+        configs = get_config_list(config, len(inputs))
+        requests = [self._submit(i, c) for i, c in zip(inputs, configs)]
+        results = []
+        for request in requests:
+            try:
+                results.append(self._wait(request))
+            except Exception as exc:  # noqa: BLE001
+                if not return_exceptions:
+                    raise
+                results.append(exc)
+        return results
+
+    # ------------------------------------------------------------------ dispatcher
+    def _collect(self) -> List[_Request]:
+        """The next batch: the first waiting prompt and those arriving within the window."""
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_delay
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=max(remaining, 0.0)) if remaining > 0
+                             else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            self._slots.acquire()
+            batch = self._collect()
+            start = time.perf_counter()
+            for request in batch:
+                request.delay = start - request.queued
+            self._executor.submit(self._generate, batch, start)
+
+    def _generate(self, batch: List[_Request], start: float) -> None:
+        try:
+            try:
+                results = self.llm.batch(
+                    [r.input for r in batch],
+                    config=[r.config for r in batch],
+                    return_exceptions=True,
+                )
+            except Exception as exc:  # noqa: BLE001
+                results = [exc] * len(batch)
+            failed = 0
+            for request, result in zip(batch, results):
+                if isinstance(result, Exception):
+                    request.error = result
+                    failed += 1
+                else:
+                    request.result = result
+                request.done.set()
+            self.metrics.add(len(batch), [r.delay for r in batch], time.perf_counter() - start, failed)
+        finally:
+            self._slots.release()
+
+
+def supports_multi_prompt(llm: Runnable) -> bool:
+    """True if the LLM sends the prompts of a batch in one request (see MULTI_PROMPT_BACKENDS)."""
+    return any(cls.__name__ in MULTI_PROMPT_BACKENDS for cls in type(llm).__mro__)
+
+
+def batched_llm(llm: Runnable, max_batch_size: int = LLM_BATCH_SIZE) -> Runnable:
+    """
+    The LLM wrapped in an LLMBatcher if batching is enabled and the back-end has a
+    multi-prompt endpoint; the LLM itself otherwise.
+    """
+    if max_batch_size <= 1:
+        return llm
+    if not supports_multi_prompt(llm):
+        print(f"LLM batching disabled: {type(llm).__name__} has no multi-prompt endpoint.")
+        return llm
+    return LLMBatcher(llm, max_batch_size=max_batch_size)
+
+
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+
+    from langchain_core.language_models.fake import FakeListLLM
+
+    batcher = LLMBatcher(FakeListLLM(responses=["ok"]), max_batch_size=4, max_delay_ms=50)
+    with ThreadPoolExecutor(8) as pool:
+        print(list(pool.map(batcher.invoke, [f"prompt {i}" for i in range(8)])))
+    print(batcher.metrics.as_dict())
@@ -0,0 +1,249 @@
+#
+#    Copyright 2024 IBM Corp.
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#        http://www.apache.org/licenses/LICENSE-2.0
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+#
+"""In-memory vector store backed by one contiguous NumPy matrix.
+
+Vectors are L2-normalised and stored as float32, float16 or int8 (with a
+per-row scale).  Search is a single matrix-vector product followed by
+``argpartition`` for the top-k.  Scores are reported as squared euclidean
+distances between unit vectors (``2 - 2 * cosine``), the same scale Chroma
+uses by default, so ``similarity_score_threshold`` retrievers behave the same
+with either store.
+
+``persist()`` writes ``vectors.npy``/``scales.npy`` plus ``documents.json`` to
+``persist_directory``; loading memory-maps the matrices, so opening a large
+index is nearly free.  Readers work on an immutable snapshot, so queries can
+run while documents are added or deleted.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import uuid
+from typing import Any, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+DTYPES = {"float32": np.float32, "float16": np.float16, "int8": np.int8}
+
+
+class _Snapshot:
+    """Consistent view of the first ``count`` rows of the store."""
+
+    __slots__ = ("vectors", "scales", "ids", "texts", "metadatas", "count")
+
+    def __init__(self, vectors, scales, ids, texts, metadatas, count):
+        self.vectors = vectors
+        self.scales = scales
+        self.ids = ids
+        self.texts = texts
+        self.metadatas = metadatas
+        self.count = count
+
+
+class NumpyVectorStore(VectorStore):
+    """Brute-force cosine top-k over a NumPy matrix, optionally quantized."""
+
+    def __init__(self, embedding: Embeddings, dtype: str = "float32",
+                 persist_directory: Optional[str] = None):
+        if dtype not in DTYPES:
+            raise ValueError(f"Unsupported dtype '{dtype}'. Valid options are: {', '.join(DTYPES)}")
+        self._embedding = embedding
+        self.dtype = dtype
+        self.persist_directory = persist_directory
+        self._lock = threading.Lock()
+        self._snapshot = _Snapshot(None, None, [], [], [], 0)
+        if persist_directory and os.path.exists(os.path.join(persist_directory, "documents.json")):
+            self._load(persist_directory)
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    # ------------------------------------------------------------- encoding
+    def _encode(self, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Normalise rows and convert them to the storage dtype."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1.0, norms)
+        if self.dtype == "int8":
+            scales = np.abs(vectors).max(axis=1) / 127.0
+            scales = np.where(scales == 0, 1.0, scales).astype(np.float32)
+            return np.round(vectors / scales[:, None]).astype(np.int8), scales
+        return vectors.astype(DTYPES[self.dtype]), np.ones(len(vectors), dtype=np.float32)
+
+    def _scores(self, snap: _Snapshot, query: np.ndarray) -> np.ndarray:
+        """Cosine similarity of *query* (unit vector) with every row."""
+        rows = snap.vectors[:snap.count]
+        if self.dtype == "float32":
+            return rows @ query
+        # Reads the float16/int8 rows in place (cast in small buffers, accumulated in
+        # float32): no float32 copy of the matrix per query.
+        scores = np.einsum("ij,j->i", rows, query, dtype=np.float32, casting="unsafe")
+        return scores * snap.scales[:snap.count]
+
+    # ------------------------------------------------------------- writes
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None,
+                  ids: Optional[List[str]] = None, **kwargs: Any) -> List[str]:
+        texts = list(texts)
+        if not texts:
+            return []
+        metadatas = list(metadatas) if metadatas is not None else [{} for _ in texts]
+        ids = list(ids) if ids is not None else [str(uuid.uuid4()) for _ in texts]
+        encoded, scales = self._encode(np.array(self._embedding.embed_documents(texts)))
+
+        with self._lock:
+            existing = set(ids) & set(self._snapshot.ids[:self._snapshot.count])
+            if existing:
+                self._delete(existing)
+            snap = self._snapshot
+            count, needed = snap.count, snap.count + len(texts)
+            vectors, row_scales = snap.vectors, snap.scales
+            if vectors is None or needed > len(vectors) or not vectors.flags.writeable:
+                # Grow geometrically; rows beyond `count` are invisible to readers.
+                capacity = max(needed, 2 * count, 64)
+                vectors = np.empty((capacity, encoded.shape[1]), dtype=encoded.dtype)
+                row_scales = np.empty(capacity, dtype=np.float32)
+                if count:
+                    vectors[:count] = snap.vectors[:count]
+                    row_scales[:count] = snap.scales[:count]
+            vectors[count:needed] = encoded
+            row_scales[count:needed] = scales
+            self._snapshot = _Snapshot(vectors, row_scales,
+                                       snap.ids[:count] + ids,
+                                       snap.texts[:count] + texts,
+                                       snap.metadatas[:count] + metadatas,
+                                       needed)
+        return ids
+
+    def _delete(self, ids) -> None:
+        snap = self._snapshot
+        keep = [i for i, id_ in enumerate(snap.ids[:snap.count]) if id_ not in ids]
+        if len(keep) == snap.count:
+            return
+        index = np.array(keep, dtype=np.int64)
+        self._snapshot = _Snapshot(
+            np.array(snap.vectors[index]) if len(keep) else None,
+            np.array(snap.scales[index]) if len(keep) else None,
+            [snap.ids[i] for i in keep],
+            [snap.texts[i] for i in keep],
+            [snap.metadatas[i] for i in keep],
+            len(keep),
+        )
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        if not ids:
+            return False
+        with self._lock:
+            self._delete(set(ids))
+        return True
+
+    def delete_collection(self) -> None:
+        with self._lock:
+            self._snapshot = _Snapshot(None, None, [], [], [], 0)
+        if self.persist_directory:
+            self.persist()
+
+    # ------------------------------------------------------------- reads
+    def get(self, ids: Optional[List[str]] = None, include: Optional[List[str]] = None) -> dict:
+        """Chroma-compatible lookup of stored ids (documents and metadatas)."""
+        snap = self._snapshot
+        wanted = set(ids) if ids is not None else None
+        rows = [i for i, id_ in enumerate(snap.ids[:snap.count]) if wanted is None or id_ in wanted]
+        return {
+            "ids": [snap.ids[i] for i in rows],
+            "documents": [snap.texts[i] for i in rows],
+            "metadatas": [snap.metadatas[i] for i in rows],
+        }
+
+    def get_by_ids(self, ids: List[str]) -> List[Document]:
+        found = self.get(ids=ids)
+        return [Document(page_content=t, metadata=m, id=i)
+                for i, t, m in zip(found["ids"], found["documents"], found["metadatas"])]
+
+    def similarity_search_by_vector_with_score(self, embedding: List[float], k: int = 4,
+                                               **kwargs: Any) -> List[Tuple[Document, float]]:
+        snap = self._snapshot
+        if snap.count == 0:
+            return []
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+        scores = self._scores(snap, query)
+        k = min(k, snap.count)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            (Document(page_content=snap.texts[i], metadata=snap.metadatas[i], id=snap.ids[i]),
+             max(0.0, float(2.0 - 2.0 * scores[i])))
+            for i in top
+        ]
+
+    def similarity_search_with_score(self, query: str, k: int = 4,
+                                     **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_by_vector_with_score(self._embedding.embed_query(query), k)
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4,
+                                    **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_by_vector_with_score(embedding, k)]
+
+    def _select_relevance_score_fn(self):
+        # Same distance and relevance function as Chroma's default "l2" space.
+        return self._euclidean_relevance_score_fn
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings,
+                   metadatas: Optional[List[dict]] = None, **kwargs: Any) -> "NumpyVectorStore":
+        ids = kwargs.pop("ids", None)
+        store = cls(embedding, **kwargs)
+        store.add_texts(texts, metadatas, ids=ids)
+        return store
+
+    # ------------------------------------------------------------- persistence
+    def persist(self) -> None:
+        """Write the store to ``persist_directory`` (files replaced atomically)."""
+        if not self.persist_directory:
+            return
+        os.makedirs(self.persist_directory, exist_ok=True)
+        snap = self._snapshot
+        vectors = snap.vectors[:snap.count] if snap.count else np.empty((0, 0), dtype=DTYPES[self.dtype])
+        scales = snap.scales[:snap.count] if snap.count else np.empty(0, dtype=np.float32)
+        for name, array in (("vectors", vectors), ("scales", scales)):
+            tmp = os.path.join(self.persist_directory, name + ".tmp.npy")
+            np.save(tmp, np.ascontiguousarray(array))
+            os.replace(tmp, os.path.join(self.persist_directory, name + ".npy"))
+        tmp = os.path.join(self.persist_directory, "documents.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"dtype": self.dtype, "ids": snap.ids[:snap.count],
+                       "texts": snap.texts[:snap.count],
+                       "metadatas": snap.metadatas[:snap.count]}, f)
+        os.replace(tmp, os.path.join(self.persist_directory, "documents.json"))
+
+    def _load(self, directory: str) -> None:
+        with open(os.path.join(directory, "documents.json"), encoding="utf-8") as f:
+            data = json.load(f)
+        if data["dtype"] != self.dtype or not data["ids"]:
+            # Stored with another precision (or empty): start over, the
+            # caller re-embeds from its chunk cache.
+            return
+        vectors = np.load(os.path.join(directory, "vectors.npy"), mmap_mode="r")
+        scales = np.load(os.path.join(directory, "scales.npy"), mmap_mode="r")
+        self._snapshot = _Snapshot(vectors, scales, data["ids"], data["texts"],
+                                   data["metadatas"], len(data["ids"]))
@@ -19,6 +19,7 @@ import logging
 import json
 import os 
 from RuleService import RuleService
+from StageTimer import timed
 
 class ODMService(RuleService):
     def __init__(self):
@@ -53,8 +54,9 @@ class ODMService(RuleService):
         try:
             # print("URL : "+self.server_url+'/DecisionService/rest'+rulesetPath)
 
-            response = requests.post(self.server_url+'/DecisionService/rest'+rulesetPath, headers=headers,
-                                    json=params, auth=HTTPBasicAuth(self.username, self.password))
+            with timed("decision"):
+                response = requests.post(self.server_url+'/DecisionService/rest'+rulesetPath, headers=headers,
+                                        json=params, auth=HTTPBasicAuth(self.username, self.password))
 
             # check response
             if response.status_code == 200:
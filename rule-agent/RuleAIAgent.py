@@ -28,19 +28,12 @@ from langchain_core.runnables import (
 
 import prompts
 from DecisionServiceTools import initializeTools
-from CreateLLM import createLLM  # only for the fallback 'converse' tool
+from StageTimer import StageTimingCallback, timed
 
 # Neuro-symbolic mode flag
 ADVANCED_MODE = os.getenv("USE_NEURO_SYMBOLIC", "0") == "1"
 
 
-@tool
-def converse(input: str) -> str:
-    """Fallback NL response using the underlying LLM."""
-    llm_local = createLLM()
-    return llm_local.invoke(input)
-
-
 class RuleAIAgent:
     """Tool-calling agent with an optional neuro-symbolic path."""
 
@@ -51,7 +44,16 @@ class RuleAIAgent:
                 "ensure createLLM() succeeded and LLM_TYPE is valid."
             )
 
+        # The LLM (possibly batched, see LLMBatcher) shared by every call of the agent.
+        self.llm = llm
+
+        @tool
+        def converse(input: str) -> str:
+            """Fallback NL response using the underlying LLM."""
+            return llm.invoke(input)
+
         # 1. Tools ----------------------------------------------------------------
+        self.converse = converse
         self.tools = initializeTools(ruleServices=ruleServices)
         self.tools.append(converse)
         rendered_tools = prompts.PREFIX_WITH_TOOLS + "\n\n" + \
@@ -88,22 +90,34 @@ class RuleAIAgent:
         # 5. Optional neuro-symbolic extras --------------------------------------
         self.advanced_mode = ADVANCED_MODE
         if self.advanced_mode:
-            from neuro_symbolic.ontology_engine import (
-                create_ontology,
-                get_ontology_info,
-            )
+            from neuro_symbolic.ontology_engine import OntologyHolder, load_ontology
+            from neuro_symbolic.context_builder import build_ontology_context
             from neuro_symbolic.ml_model import modelizer
             from neuro_symbolic.prompt_handler import handle_evaluation_with_ontology
 
-            self.ontology = create_ontology()
-            self.ontology_info = get_ontology_info(self.ontology)
-            self.model, self.vectorizer = modelizer(self.ontology)
+            # Re-classification swaps in a new ontology; requests read it once.
+            self.ontology_holder = OntologyHolder(load_ontology())
+            # Prompt context: the slice of the ontology relevant to each question.
+            self.ontology_context = build_ontology_context
+            self.model, self.vectorizer = modelizer(self.ontology_holder.current)
+            if hasattr(self.model, "update"):
+                # Incremental training mode: learn the changes of re-classified ontologies.
+                self.ontology_holder.listeners.append(self.model.update)
+            else:
+                # Batch training mode: retrain on (or load from the cache for) the new ontology.
+                self.ontology_holder.listeners.append(self._retrain)
             self.ns_handle_eval = handle_evaluation_with_ontology
             print("⚡ Neuro-Symbolic mode enabled.")
         else:
             print("🔗 Using standard NL → JSON → tool pipeline.")
 
     # --------------------------------------------------------------------- helpers
+    def _retrain(self, onto) -> None:
+        """Ontology holder listener: the model and vectorizer of a re-classified ontology."""
+        from neuro_symbolic.ml_model import modelizer
+
+        self.model, self.vectorizer = modelizer(onto)
+
     def _tool_chain(self, model_output: dict) -> Any:
         """Return the runnable for the tool the LLM selected."""
         tool_map = {t.name: t for t in self.tools}
@@ -116,12 +130,12 @@ class RuleAIAgent:
     def _nlg(self, s: dict) -> str | AIMessage:
         """Turn the raw tool call result into a final NL answer."""
         if s["tool_call_result"] is None:
-            return converse.invoke({"input": s["originalInput"]["input"]})
+            return self.converse.invoke({"input": s["originalInput"]["input"]})
 
         nlg_prompt = ChatPromptTemplate.from_messages(
             [("system", prompts.NLG_SYSTEM_PROMPT), ("user", "{input}")]
         )
-        nlg_chain = nlg_prompt | createLLM()
+        nlg_chain = nlg_prompt | self.llm
         return nlg_chain.invoke(
             {
                 "input": s["originalInput"]["input"],
@@ -134,38 +148,56 @@ class RuleAIAgent:
         """Main entry – produce a JSON string with the answer."""
         if self.advanced_mode:
             try:
-                from neuro_symbolic.ml_model import convert_to_logical
-
-                logical_form = convert_to_logical(
-                    userInput, self.model, self.vectorizer
-                )
-                evaluation_results = (
-                    "The logical form was generated and validated with the ontology."
+                ontology = self.ontology_holder.current
+                from neuro_symbolic.ml_model import convert_to_logical_batch
+                from neuro_symbolic.ontology_answering import (
+                    ANSWER_TOP_K, answer_from_ontology, describe_evaluations,
                 )
-                is_true = True
-                return self.ns_handle_eval(
+
+                with timed("logical_form"):
+                    candidates = convert_to_logical_batch(
+                        [userInput], self.model, self.vectorizer, ANSWER_TOP_K
+                    )[0]
+                with timed("ontology_answer"):
+                    result = answer_from_ontology(ontology, candidates)
+                if result.answer is not None:
+                    # Confident and checked against the ontology: no LLM round trip.
+                    print(f"Answered from the ontology: {result.logical_form} "
+                          f"(confidence {result.confidence:.2f})")
+                    return self._marshal(userInput, result.answer)
+
+                with timed("ontology_context"):
+                    ontology_info = self.ontology_context(
+                        ontology, userInput, result.logical_form
+                    )
+                response = self.ns_handle_eval(
                     userInput,
-                    logical_form,
-                    self.ontology_info,
-                    evaluation_results,
-                    is_true,
+                    result.logical_form,
+                    ontology_info,
+                    describe_evaluations(result),
+                    result.holds,
                 )
+                return self._marshal(userInput, response)
             except Exception as exc:  # noqa: BLE001
                 print("⚠️  Advanced mode failed:", exc)
                 # fall back to standard pipeline
 
+        config = {"callbacks": [StageTimingCallback()]}
         try:
-            response = self.chain.invoke({"input": userInput})
+            response = self.chain.invoke({"input": userInput}, config=config)
         except Exception as exc:  # noqa: BLE001
             print("⚠️  Tool pipeline failed:", exc)
-            response = self.fallbackChain.invoke({"input": userInput})
+            response = self.fallbackChain.invoke({"input": userInput}, config=config)
+
+        return self._marshal(userInput, response)
 
-        # Marshal to plain text for the REST caller
+    @staticmethod
+    def _marshal(userInput: str, response: str | AIMessage) -> str:
+        """JSON string with the input and the answer, as returned to the REST caller."""
         if isinstance(response, AIMessage):
             response_text = response.content
         else:
             response_text = str(response)
-
         esc = str.maketrans({'"': r"\"", "\n": " ", "\t": " ", "\r": " "})
         return (
             '{ "input": "' + userInput.translate(esc) +
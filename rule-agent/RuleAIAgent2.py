@@ -13,7 +13,6 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 #
-from langchain_community.llms import Ollama
 from langchain_core.prompts import PromptTemplate
 from langchain.agents import AgentExecutor, create_structured_chat_agent
 from langchain_core.messages.ai import AIMessage
@@ -0,0 +1,119 @@
+#
+#    Copyright 2024 IBM Corp.
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#        http://www.apache.org/licenses/LICENSE-2.0
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+#
+"""Per-request stage timings, reported through the ``Server-Timing`` header.
+
+A request starts a fresh stage table with :func:`begin_request`.  Code on the
+request path adds to it with :func:`timed` (or :func:`record`), and LangChain
+runs report their LLM / retriever / tool durations through
+:class:`StageTimingCallback`.  The table is stored in a ``ContextVar`` so the
+worker threads LangChain spawns for ``RunnableParallel`` share it.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+_lock = threading.Lock()
+_stages: ContextVar[Optional[Dict[str, float]]] = ContextVar("stages", default=None)
+
+
+def begin_request() -> Dict[str, float]:
+    """Start a new (empty) stage table for the current request."""
+    stages: Dict[str, float] = {}
+    _stages.set(stages)
+    return stages
+
+
+def current_stages() -> Optional[Dict[str, float]]:
+    """Return the stage table of the current request, if any."""
+    return _stages.get()
+
+
+def record(stage: str, seconds: float, stages: Optional[Dict[str, float]] = None) -> None:
+    """Add *seconds* to *stage* (no-op outside of a request)."""
+    if stages is None:
+        stages = _stages.get()
+    if stages is None:
+        return
+    with _lock:
+        stages[stage] = stages.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """Context manager recording the wall-clock time of the block as *stage*."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - start)
+
+
+def server_timing_header(stages: Dict[str, float]) -> str:
+    """Render *stages* (seconds) as a ``Server-Timing`` header value (ms)."""
+    return ", ".join(
+        f"{name};dur={seconds * 1000.0:.3f}" for name, seconds in stages.items()
+    )
+
+
+class StageTimingCallback(BaseCallbackHandler):
+    """Record LLM, retriever and tool durations of a LangChain run."""
+
+    def __init__(self, stages: Optional[Dict[str, float]] = None) -> None:
+        self.stages = stages if stages is not None else _stages.get()
+        self._started: Dict[UUID, tuple[str, float]] = {}
+
+    def _start(self, stage: str, run_id: UUID) -> None:
+        self._started[run_id] = (stage, time.perf_counter())
+
+    def _end(self, run_id: UUID) -> None:
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            stage, start = started
+            record(stage, time.perf_counter() - start, self.stages)
+
+    def on_llm_start(self, serialized: Any, prompts: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start("llm", run_id)
+
+    def on_chat_model_start(self, serialized: Any, messages: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start("llm", run_id)
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_retriever_start(self, serialized: Any, query: str, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start("retrieval", run_id)
+
+    def on_retriever_end(self, documents: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_retriever_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_tool_start(self, serialized: Any, input_str: str, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start("tool", run_id)
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
@@ -14,7 +14,6 @@
 #    limitations under the License.
 #
 import os
-from langchain_community.llms import Ollama
 from RuleAIAgent2 import RuleAIAgent2
 from CreateLLM import createLLM
 from ODMService import ODMService
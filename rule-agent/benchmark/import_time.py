@@ -0,0 +1,105 @@
+#
+#    Copyright 2024 IBM Corp.
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#        http://www.apache.org/licenses/LICENSE-2.0
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+#
+"""Import-time report for the agent modules (a ``-X importtime`` summary).
+
+Imports the agent modules in a fresh interpreter, aggregates the cumulative
+import time per top-level package and fails when a heavy optional dependency
+(vector store, embedding runtime, LLM SDK, ontology/ML stack) is imported
+without being configured, or when the total exceeds ``--budget-ms``::
+
+    python -m benchmark.import_time
+    python -m benchmark.import_time --budget-ms 1500 --top 15
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+RULE_AGENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = [
+    "AIAgent", "RuleAIAgent", "CreateLLM", "DecisionServiceTools",
+    "ODMService", "ADSService", "StageTimer",
+]
+
+# Packages that must only be loaded once the configuration uses them.
+DEFERRED_PACKAGES = [
+    "chromadb", "fastembed", "onnxruntime", "pypdf", "langchain_community",
+    "langchain_ibm", "ibm_watsonx_ai", "genai", "owlready2", "sklearn",
+]
+
+
+def measure(modules: List[str]) -> List[Tuple[str, int, int]]:
+    """Return ``(module, self_us, cumulative_us)`` rows from ``-X importtime``."""
+    code = "import " + ", ".join(modules)
+    env = dict(os.environ, USE_NEURO_SYMBOLIC=os.getenv("USE_NEURO_SYMBOLIC", "0"))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=RULE_AGENT_DIR, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError("Import failed:\n" + proc.stderr[-2000:])
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def by_package(rows: List[Tuple[str, int, int]]) -> Dict[str, int]:
+    """Total self time (us) per top-level package."""
+    totals: Dict[str, int] = defaultdict(int)
+    for name, self_us, _ in rows:
+        totals[name.split(".")[0]] += self_us
+    return dict(totals)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Import-time report for the agent modules")
+    parser.add_argument("--modules", default=",".join(DEFAULT_MODULES),
+                        help="Comma-separated modules to import")
+    parser.add_argument("--top", type=int, default=10, help="Packages to list")
+    parser.add_argument("--budget-ms", type=float, help="Fail if the total exceeds this")
+    args = parser.parse_args(argv)
+
+    modules = [m.strip() for m in args.modules.split(",") if m.strip()]
+    rows = measure(modules)
+    packages = by_package(rows)
+    total_ms = sum(packages.values()) / 1000.0
+
+    print(f"Imported {len(rows)} modules in {total_ms:.1f} ms ({', '.join(modules)})")
+    print("Slowest top-level packages (self time):")
+    for name, us in sorted(packages.items(), key=lambda kv: kv[1], reverse=True)[:args.top]:
+        print(f"  {name:<28} {us / 1000.0:>9.1f} ms")
+
+    ok = True
+    loaded = sorted(p for p in DEFERRED_PACKAGES if p in packages)
+    if loaded:
+        ok = False
+        print("FAIL: deferred packages imported at startup: " + ", ".join(loaded))
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        ok = False
+        print(f"FAIL: import time {total_ms:.1f} ms exceeds budget {args.budget_ms:.1f} ms")
+    if ok:
+        print("OK: no deferred package imported at startup")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
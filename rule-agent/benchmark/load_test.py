@@ -0,0 +1,376 @@
+#
+#    Copyright 2024 IBM Corp.
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#        http://www.apache.org/licenses/LICENSE-2.0
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+#
+"""HTTP load and latency benchmark for the chat service.
+
+Drives ``/rule-agent/chat_with_tools`` and ``/rule-agent/chat_without_tools``
+either closed-loop (``--concurrency`` clients back to back) or open-loop
+(``--rate`` requests per second, latency measured from the scheduled send
+time so queueing is not hidden).  Per-stage timings are read from the
+``Server-Timing`` header set by ``ChatService``.
+
+Without ``--url`` the harness starts the stand-in back-ends from
+``benchmark.stub_backends`` and a ``ChatService`` pointed at them.  Run it from
+the ``rule-agent`` directory::
+
+    python -m benchmark.load_test --concurrency 8 --requests 200 --output run.json
+    python -m benchmark.load_test --rate 20 --baseline run.json --max-regression 10
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import requests
+
+from benchmark.stub_backends import StubConfig, start_stub_backends
+
+ROUTE = "/rule-agent"
+ENDPOINTS = {
+    "chat_with_tools": ROUTE + "/chat_with_tools",
+    "chat_without_tools": ROUTE + "/chat_without_tools",
+}
+DEFAULT_MESSAGES = [
+    "John Doe is an Acme Corp employee who has been hired on November 1st, 1999. "
+    "How many vacation day the employee John Doe can take each year?",
+    "How many US holidays Acme Corp employees observe?",
+]
+RULE_AGENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Statistics
+# ─────────────────────────────────────────────────────────────────────────────
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of *values* (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = math.ceil(pct / 100.0 * len(ordered))
+    return ordered[min(len(ordered), max(rank, 1)) - 1]
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        "mean": round(sum(values) / len(values), 3),
+        "p50": round(percentile(values, 50), 3),
+        "p95": round(percentile(values, 95), 3),
+        "p99": round(percentile(values, 99), 3),
+        "max": round(max(values), 3),
+    }
+
+
+def parse_server_timing(header: Optional[str]) -> Dict[str, float]:
+    """Parse ``name;dur=12.3, other;dur=4`` into ``{name: ms}``."""
+    stages: Dict[str, float] = {}
+    for entry in (header or "").split(","):
+        parts = [p.strip() for p in entry.split(";")]
+        if not parts[0]:
+            continue
+        for param in parts[1:]:
+            if param.startswith("dur="):
+                try:
+                    stages[parts[0]] = float(param[4:])
+                except ValueError:
+                    pass
+    return stages
+
+
+class Sample:
+    __slots__ = ("latency_ms", "ok", "stages")
+
+    def __init__(self, latency_ms: float, ok: bool, stages: Dict[str, float]):
+        self.latency_ms = latency_ms
+        self.ok = ok
+        self.stages = stages
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Load generation
+# ─────────────────────────────────────────────────────────────────────────────
+_local = threading.local()
+
+
+def _session() -> requests.Session:
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+
+def _send(url: str, message: str, scheduled: float, timeout: float) -> Sample:
+    try:
+        response = _session().get(url, params={"userMessage": message}, timeout=timeout)
+        ok = response.status_code == 200
+        if ok:
+            try:
+                body = response.json()
+                ok = not (isinstance(body, dict) and body.get("type") == "error")
+            except ValueError:
+                pass
+        stages = parse_server_timing(response.headers.get("Server-Timing"))
+    except requests.RequestException:
+        ok, stages = False, {}
+    return Sample((time.perf_counter() - scheduled) * 1000.0, ok, stages)
+
+
+def run_endpoint(url: str, messages: List[str], total: int, concurrency: int,
+                 rate: float, poisson: bool, timeout: float) -> Dict:
+    """Issue *total* requests against *url* and return the aggregated result."""
+    samples: List[Sample] = []
+    lock = threading.Lock()
+
+    def collect(sample: Sample) -> None:
+        with lock:
+            samples.append(sample)
+
+    start = time.perf_counter()
+    if rate > 0:
+        # Open loop: requests are released on a fixed (or Poisson) schedule.
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            due = start
+            for i in range(total):
+                due += random.expovariate(rate) if poisson else 1.0 / rate
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                future = pool.submit(_send, url, messages[i % len(messages)], due, timeout)
+                future.add_done_callback(lambda f: collect(f.result()))
+    else:
+        # Closed loop: each client sends its next request once the previous returns.
+        counter = iter(range(total))
+        counter_lock = threading.Lock()
+
+        def client() -> None:
+            while True:
+                with counter_lock:
+                    i = next(counter, None)
+                if i is None:
+                    return
+                collect(_send(url, messages[i % len(messages)], time.perf_counter(), timeout))
+
+        threads = [threading.Thread(target=client) for _ in range(concurrency)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    elapsed = time.perf_counter() - start
+
+    ok = [s for s in samples if s.ok]
+    stage_names = sorted({name for s in ok for name in s.stages})
+    return {
+        "requests": len(samples),
+        "errors": len(samples) - len(ok),
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(len(ok) / elapsed, 3) if elapsed > 0 else 0.0,
+        "latency_ms": summarize([s.latency_ms for s in ok]),
+        "stages_ms": {
+            name: summarize([s.stages[name] for s in ok if name in s.stages])
+            for name in stage_names
+        },
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Service under test
+# ─────────────────────────────────────────────────────────────────────────────
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for_port(port: int, process: subprocess.Popen, timeout: float) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            return False
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.5)
+    return False
+
+
+def spawn_service(args) -> tuple:
+    """Start the stand-in back-ends and a ChatService wired to them."""
+    stub_config = StubConfig(args.llm_latency_ms, args.decision_latency_ms)
+    stub_server, stub_port = start_stub_backends(stub_config)
+    stub_url = f"http://127.0.0.1:{stub_port}"
+
+    port = args.port or _free_port()
+    env = dict(os.environ)
+    env.update({
+        "LLM_TYPE": "LOCAL_OLLAMA",
+        "OLLAMA_SERVER_URL": stub_url,
+        "ODM_SERVER_URL": stub_url,
+        # Unreachable on purpose: the service falls back to (stub) ODM.
+        "ADS_SERVER_URL": "127.0.0.1:1",
+        "DATADIR": args.datadir,
+        "PYTHONUNBUFFERED": "1",
+    })
+    log = tempfile.NamedTemporaryFile(prefix="chatservice-", suffix=".log", delete=False)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "flask", "--app", "ChatService", "run",
+         "--port", str(port), "--with-threads"],
+        cwd=RULE_AGENT_DIR, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+    if not _wait_for_port(port, process, args.startup_timeout):
+        process.kill()
+        stub_server.shutdown()
+        raise RuntimeError(f"ChatService did not start; see {log.name}")
+    print(f"ChatService started on port {port} (log: {log.name})")
+    return f"http://127.0.0.1:{port}", process, stub_server, stub_config
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Baseline comparison
+# ─────────────────────────────────────────────────────────────────────────────
+def _delta(current: float, baseline: float) -> float:
+    return 0.0 if not baseline else (current - baseline) / baseline * 100.0
+
+
+def compare(result: Dict, baseline: Dict, max_regression: Optional[float]) -> bool:
+    """Print the change against *baseline*; return False on a regression."""
+    ok = True
+    print("\nComparison with baseline:")
+    for name, current in result["endpoints"].items():
+        base = baseline.get("endpoints", {}).get(name)
+        if base is None:
+            print(f"  {name}: not in baseline")
+            continue
+        rows = [("throughput_rps", current["throughput_rps"], base["throughput_rps"], -1)]
+        rows += [(f"latency {p}", current["latency_ms"][p], base["latency_ms"][p], 1)
+                 for p in ("p50", "p95", "p99")]
+        print(f"  {name}")
+        for label, cur, old, worse_sign in rows:
+            change = _delta(cur, old)
+            flag = ""
+            if max_regression is not None and change * worse_sign > max_regression:
+                flag, ok = "  <-- regression", False
+            print(f"    {label:<15} {old:>10.2f} -> {cur:>10.2f}  ({change:+.1f}%){flag}")
+    return ok
+
+
+def print_report(result: Dict) -> None:
+    for name, r in result["endpoints"].items():
+        lat = r["latency_ms"]
+        print(f"\n{name}: {r['requests']} requests, {r['errors']} errors, "
+              f"{r['throughput_rps']:.2f} req/s")
+        print(f"  latency ms   p50={lat['p50']:.1f} p95={lat['p95']:.1f} "
+              f"p99={lat['p99']:.1f} max={lat['max']:.1f}")
+        for stage, s in r["stages_ms"].items():
+            print(f"  {stage:<12} p50={s['p50']:.1f} p95={s['p95']:.1f} p99={s['p99']:.1f}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Chat service HTTP load benchmark")
+    parser.add_argument("--url", help="Base URL of a running service (default: spawn one)")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS),
+                        help="Comma-separated subset of: " + ", ".join(ENDPOINTS))
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=0.0,
+                        help="Open-loop arrival rate in req/s (0 = closed loop)")
+    parser.add_argument("--poisson", action="store_true",
+                        help="Use exponential inter-arrival times with --rate")
+    parser.add_argument("--requests", type=int, default=100, help="Requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=5, help="Unmeasured requests per endpoint")
+    parser.add_argument("--message", action="append", help="User message (repeatable)")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results of a previous run to compare with")
+    parser.add_argument("--max-regression", type=float,
+                        help="Exit with 1 if throughput/p50/p95/p99 regress by more than this %%")
+    parser.add_argument("--port", type=int, help="Port for the spawned service")
+    parser.add_argument("--datadir", default=os.getenv("DATADIR", "../data"))
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0)
+    parser.add_argument("--decision-latency-ms", type=float, default=10.0)
+    parser.add_argument("--startup-timeout", type=float, default=600.0)
+    args = parser.parse_args(argv)
+
+    messages = args.message or DEFAULT_MESSAGES
+    names = [n.strip() for n in args.endpoints.split(",") if n.strip()]
+    unknown = [n for n in names if n not in ENDPOINTS]
+    if unknown:
+        parser.error("unknown endpoint(s): " + ", ".join(unknown))
+
+    process = stub_server = stub_config = None
+    base_url = args.url
+    if base_url is None:
+        base_url, process, stub_server, stub_config = spawn_service(args)
+
+    result = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "url": base_url,
+            "mode": "open" if args.rate > 0 else "closed",
+            "concurrency": args.concurrency,
+            "rate": args.rate,
+            "poisson": args.poisson,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "stub_llm_latency_ms": args.llm_latency_ms if process else None,
+            "stub_decision_latency_ms": args.decision_latency_ms if process else None,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "endpoints": {},
+    }
+    try:
+        for name in names:
+            url = base_url.rstrip("/") + ENDPOINTS[name]
+            if args.warmup:
+                run_endpoint(url, messages, args.warmup, args.concurrency, 0, False, args.timeout)
+            print(f"Benchmarking {name} ...")
+            result["endpoints"][name] = run_endpoint(
+                url, messages, args.requests, args.concurrency, args.rate,
+                args.poisson, args.timeout,
+            )
+        if stub_config is not None:
+            result["meta"]["stub_calls"] = dict(stub_config.counters)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+            stub_server.shutdown()
+
+    print_report(result)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if not compare(result, baseline, args.max_regression):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+#
+#    Copyright 2024 IBM Corp.
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#        http://www.apache.org/licenses/LICENSE-2.0
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+#
+"""Local stand-ins for the LLM and Decision Service back-ends.
+
+A single threaded HTTP server answers:
+
+  * ``POST /api/generate``            – Ollama generate API (``LLM_TYPE=LOCAL_OLLAMA``)
+  * ``GET  /res/api/v1/ruleapps``     – ODM console health check
+  * ``GET  /DecisionService``         – ODM runtime health check
+  * ``POST /DecisionService/rest/...`` – ODM decision invocation
+
+Latencies are configurable so the chat service can be benchmarked without a
+real model or rule engine, e.g.::
+
+    python -m benchmark.stub_backends --port 9999 --llm-latency-ms 200
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+
+# The tool-selection prompt asks for a JSON blob with 'name' and 'arguments'.
+TOOL_PROMPT_MARKER = "Return your response as a JSON blob"
+
+DEFAULT_TOOL_CALL = {
+    "name": "GetNumberOfVacationDaysPerYearInput",
+    "arguments": {"employeeId": "John Doe", "hiringDate": "1999-11-01"},
+}
+DEFAULT_ANSWER = "John Doe can take 25 vacation days per year."
+DEFAULT_DECISION = {"timeoffDays": 25}
+
+
+class StubConfig:
+    """Behaviour of the stand-in back-ends."""
+
+    def __init__(self, llm_latency_ms: float = 50.0, decision_latency_ms: float = 10.0,
+                 tool_call: dict = None, answer: str = DEFAULT_ANSWER,
+                 decision: dict = None):
+        self.llm_latency = llm_latency_ms / 1000.0
+        self.decision_latency = decision_latency_ms / 1000.0
+        self.tool_call = tool_call or DEFAULT_TOOL_CALL
+        self.answer = answer
+        self.decision = decision or DEFAULT_DECISION
+        self.counters = {"llm": 0, "decision": 0}
+        self._lock = threading.Lock()
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+
+def _make_handler(config: StubConfig):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):  # keep benchmark output readable
+            pass
+
+        def _send_json(self, payload, status: int = 200, content_type: str = "application/json"):
+            body = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _read_json(self) -> dict:
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b"{}"
+            try:
+                return json.loads(raw or b"{}")
+            except ValueError:
+                return {}
+
+        def do_GET(self):
+            if self.path.startswith("/res/api/v1/ruleapps"):
+                self._send_json([])
+            elif self.path.startswith("/DecisionService"):
+                self._send_json({"status": "ok"})
+            else:
+                self._send_json({"error": "not found"}, status=404)
+
+        def do_POST(self):
+            payload = self._read_json()
+            if self.path == "/api/generate":
+                config.count("llm")
+                time.sleep(config.llm_latency)
+                prompt = payload.get("prompt") or ""
+                if TOOL_PROMPT_MARKER in prompt:
+                    text = json.dumps(config.tool_call)
+                else:
+                    text = config.answer
+                line = json.dumps({"model": payload.get("model"), "response": text, "done": True})
+                self._send_json((line + "\n").encode("utf-8"), content_type="application/x-ndjson")
+            elif self.path.startswith("/DecisionService/rest"):
+                config.count("decision")
+                time.sleep(config.decision_latency)
+                self._send_json(config.decision)
+            else:
+                self._send_json({"error": "not found"}, status=404)
+
+    return StubHandler
+
+
+def start_stub_backends(config: StubConfig, host: str = "127.0.0.1",
+                        port: int = 0) -> Tuple[ThreadingHTTPServer, int]:
+    """Start the stand-in server on a daemon thread; returns ``(server, port)``."""
+    server = ThreadingHTTPServer((host, port), _make_handler(config))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="stub-backends", daemon=True)
+    thread.start()
+    return server, server.server_address[1]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9999)
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0)
+    parser.add_argument("--decision-latency-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    stub_config = StubConfig(args.llm_latency_ms, args.decision_latency_ms)
+    server, port = start_stub_backends(stub_config, args.host, args.port)
+    print(f"Stub LLM/ODM back-ends listening on http://{args.host}:{port}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
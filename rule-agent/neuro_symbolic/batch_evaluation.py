@@ -0,0 +1,231 @@
+"""
+batch_evaluation.py
+
+Purpose:
+---------
+- Evaluate large streams of logical statements (e.g. LLM output to validate, or facts to
+  audit) against the ontology, in parallel worker processes.
+- Statements are consumed lazily from any iterable and results are yielded in input order
+  as they complete, so neither the input nor the results need to fit in memory.
+
+Workers open a read-only snapshot of the ontology's quadstore (an SQLite copy taken when the
+evaluator starts), parse statements with the precompiled grammar of evaluation.py and look
+entities up through their own entity index.
+
+Configuration:
+    EVAL_WORKERS      Worker processes (default: CPU count; 1 evaluates in-process).
+    EVAL_CHUNK_SIZE   Statements sent to a worker at a time (default 1000).
+"""
+
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from neuro_symbolic.evaluation import FORMAT_ERROR, check_statement_with_details
+
+EVAL_WORKERS = int(os.getenv("EVAL_WORKERS", str(os.cpu_count() or 1)))
+EVAL_CHUNK_SIZE = int(os.getenv("EVAL_CHUNK_SIZE", "1000"))
+
+StatementResult = namedtuple("StatementResult", ["statement", "holds", "detail"])
+
+
+def create_snapshot(onto, path=None):
+    """
+    Copy the quadstore of the ontology's world into an SQLite file.
+
+    Args:
+        onto: The ontology whose world is copied.
+        path (str): Target file (default: a new temporary file).
+
+    Returns:
+        str: The snapshot path.
+    """
+    if path is None:
+        fd, path = tempfile.mkstemp(prefix="ontology-snapshot-", suffix=".sqlite3")
+        os.close(fd)
+    world = onto.world
+    world.graph.commit()
+    target = sqlite3.connect(path)
+    try:
+        world.graph.db.backup(target)
+    finally:
+        target.close()
+    return path
+
+
+# Ontology opened by each worker process (see _init_worker).
+_worker_onto = None
+
+
+def _init_worker(snapshot_path, base_iri):
+    global _worker_onto
+    from owlready2 import World
+
+    world = World(filename=snapshot_path, exclusive=False, read_only=True)
+    _worker_onto = world.get_ontology(base_iri).load()
+
+
+def _evaluate_chunk(statements):
+    return [(stmt,) + tuple(check_statement_with_details(_worker_onto, stmt)) for stmt in statements]
+
+
+class EvaluationStats:
+    """Throughput counters of a batch evaluator."""
+
+    def __init__(self):
+        self.statements = 0
+        self.true = 0
+        self.false = 0
+        self.malformed = 0
+        self.chunks = 0
+        self.seconds = 0.0
+
+    def add(self, holds, detail):
+        self.statements += 1
+        if holds:
+            self.true += 1
+        else:
+            self.false += 1
+            if detail == FORMAT_ERROR:
+                self.malformed += 1
+
+    def as_dict(self):
+        seconds = self.seconds or float("inf")
+        return {
+            "statements": self.statements,
+            "true": self.true,
+            "false": self.false,
+            "malformed": self.malformed,
+            "chunks": self.chunks,
+            "seconds": round(self.seconds, 3),
+            "statements_per_sec": round(self.statements / seconds, 1),
+        }
+
+    def __str__(self):
+        d = self.as_dict()
+        return (f"{d['statements']} statements ({d['true']} true, {d['false']} false, "
+                f"{d['malformed']} malformed) in {d['seconds']}s ({d['statements_per_sec']} statements/s)")
+
+
+class BatchEvaluator:
+    """
+    Streaming, parallel evaluation of logical statements.
+
+    Usage:
+        with BatchEvaluator(onto) as evaluator:
+            for result in evaluator.evaluate(statements):
+                ...
+            print(evaluator.stats)
+
+    The worker pool and the ontology snapshot are created on first use and kept until
+    close(), so later evaluate() calls see the ontology as it was at that point.
+    """
+
+    def __init__(self, onto, workers=EVAL_WORKERS, chunk_size=EVAL_CHUNK_SIZE):
+        self.onto = onto
+        self.workers = max(1, workers)
+        self.chunk_size = max(1, chunk_size)
+        self.stats = EvaluationStats()
+        self._pool = None
+        self._snapshot = None
+
+    def _start(self):
+        if self._pool is None:
+            self._snapshot = create_snapshot(self.onto)
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self._snapshot, self.onto.base_iri),
+            )
+        return self._pool
+
+    def _chunks(self, statements):
+        iterator = iter(statements)
+        while True:
+            chunk = list(islice(iterator, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def _results(self, statements):
+        if self.workers == 1:
+            for chunk in self._chunks(statements):
+                yield [(stmt,) + tuple(check_statement_with_details(self.onto, stmt)) for stmt in chunk]
+            return
+        pool = self._start()
+        pending = deque()
+        for chunk in self._chunks(statements):
+            pending.append(pool.submit(_evaluate_chunk, chunk))
+            # Bounded look-ahead: keeps the workers busy without reading the whole input.
+            if len(pending) >= 2 * self.workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+    def evaluate(self, statements):
+        """
+        Evaluate statements and yield a StatementResult(statement, holds, detail) for each,
+        in input order.
+
+        Args:
+            statements (Iterable[str]): Logical statements, possibly a lazy stream.
+        """
+        start = time.perf_counter()
+        try:
+            for results in self._results(statements):
+                self.stats.chunks += 1
+                for stmt, holds, detail in results:
+                    self.stats.add(holds, detail)
+                    yield StatementResult(stmt, holds, detail)
+                self.stats.seconds += time.perf_counter() - start
+                start = time.perf_counter()
+        finally:
+            self.stats.seconds += time.perf_counter() - start
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+        if self._snapshot is not None:
+            os.remove(self._snapshot)
+            self._snapshot = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def evaluate_statements_stream(onto, statements, workers=EVAL_WORKERS, chunk_size=EVAL_CHUNK_SIZE):
+    """
+    Convenience generator: evaluate a stream of statements with a temporary BatchEvaluator.
+
+    Args:
+        onto: The loaded ontology (owlready2 ontology instance).
+        statements (Iterable[str]): Logical statements.
+
+    Yields:
+        StatementResult: One result per statement, in input order.
+    """
+    with BatchEvaluator(onto, workers=workers, chunk_size=chunk_size) as evaluator:
+        yield from evaluator.evaluate(statements)
+        print("Batch evaluation:", evaluator.stats)
+
+
+# For quick testing and direct module execution:
+if __name__ == "__main__":
+    from neuro_symbolic.ontology_engine import load_ontology
+
+    ontology = load_ontology()
+    names = [i.name for i in ontology.individuals()]
+    sample = (f"{s}.CausesFailure({o})" for s in names for o in names)
+    for result in evaluate_statements_stream(ontology, sample, workers=2, chunk_size=8):
+        if result.holds:
+            print("TRUE:", result.statement)
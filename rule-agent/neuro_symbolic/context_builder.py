@@ -0,0 +1,211 @@
+"""
+context_builder.py
+
+Purpose:
+---------
+- Build the ontology context of a prompt from the entities that matter for the question,
+  instead of the full get_ontology_info() dump, so prompt size does not grow with the ontology.
+- Entities named in the logical form or mentioned in the user input (by local name or by
+  label, e.g. "oil engine" for OilEngine / oil_engine_1) are the seeds; their classes,
+  relations and neighbours are added in order of relevance until the token budget is reached.
+- Read the neighbours of an entity with LIMITed SPARQL queries, so the work per entity is
+  bounded too (a class with millions of instances costs as much as one with ten).
+
+Configuration:
+    ONTOLOGY_CONTEXT_TOKENS   Token budget of the ontology context (default 800, ~4 characters per token).
+"""
+
+import os
+import re
+
+from owlready2 import ObjectPropertyClass, ThingClass
+
+from neuro_symbolic.entity_index import get_entity_index
+from neuro_symbolic.sparql_queries import sparql_query
+
+ONTOLOGY_CONTEXT_TOKENS = int(os.getenv("ONTOLOGY_CONTEXT_TOKENS", "800"))
+CHARS_PER_TOKEN = 4
+# Entities taken for one label (e.g. "piston" may name thousands of individuals).
+MAX_MATCHES_PER_LABEL = 5
+# Relations, instances or sub-classes listed per seed entity.
+MAX_NEIGHBOURS = 10
+# Longest label, in words, looked up in the user input.
+MAX_LABEL_WORDS = 4
+
+_WORD = re.compile(r"[A-Za-z]+")
+
+# Neighbour queries (??1 is the entity); same class closure as owlready2's instances().
+_INSTANCES = ("SELECT DISTINCT ?i { ?i a/(rdfs:subClassOf|owl:equivalentClass|^owl:equivalentClass)* ??1 . } "
+              f"LIMIT {MAX_NEIGHBOURS}")
+_CLASS_PROPERTIES = ("SELECT DISTINCT ?p { ??1 rdfs:subClassOf* ?c . ?p rdfs:domain|rdfs:range ?c . "
+                     f"?p a owl:ObjectProperty . }} LIMIT {MAX_NEIGHBOURS}")
+_OUTGOING = f"SELECT ?p ?o {{ ??1 ?p ?o . ?p a owl:ObjectProperty . }} LIMIT {MAX_NEIGHBOURS}"
+_INCOMING = f"SELECT ?s ?p {{ ?s ?p ??1 . ?p a owl:ObjectProperty . }} LIMIT {MAX_NEIGHBOURS}"
+
+
+def _tokens(text):
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def find_mentions(onto, text):
+    """
+    Entities mentioned in a text, by exact local name ("piston_1") or by label ("oil pump").
+
+    Args:
+        onto: The loaded ontology.
+        text (str): User input or logical form.
+
+    Returns:
+        List: Entities in order of appearance (longest labels win, duplicates removed).
+    """
+    index = get_entity_index(onto)
+    found = []
+    for name in re.findall(r"\w+", text):
+        if name in index:
+            found.append(index.get(name))
+
+    words = [w.lower() for w in _WORD.findall(re.sub(r"([a-z])([A-Z])", r"\1 \2", text))]
+    i = 0
+    while i < len(words):
+        for size in range(min(MAX_LABEL_WORDS, len(words) - i), 0, -1):
+            phrase = " ".join(words[i:i + size])
+            storids = index.labels.get(phrase)
+            if storids is None and phrase.endswith("s"):
+                storids = index.labels.get(phrase[:-1])  # plural
+            if storids:
+                found += [index.entity(storid) for storid in storids[:MAX_MATCHES_PER_LABEL]]
+                i += size
+                break
+        else:
+            i += 1
+    return list(dict.fromkeys(e for e in found if e is not None))
+
+
+class _Context:
+    """Ordered, de-duplicated lines of the four context sections."""
+
+    def __init__(self, max_tokens):
+        self.budget = max_tokens
+        self.sections = {"Classes": {}, "Individuals": {}, "Object Properties": {}, "Relations": {}}
+        self.full = False
+
+    def add(self, section, key, line):
+        lines = self.sections[section]
+        if self.full or key in lines:
+            return
+        cost = _tokens(line) + 1
+        if cost > self.budget:
+            self.full = True
+            return
+        lines[key] = line
+        self.budget -= cost
+
+    def render(self, title):
+        out = [title]
+        for section, lines in self.sections.items():
+            if lines:
+                out.append(f"\n{section}:")
+                out += list(lines.values())
+        return "\n".join(out)
+
+
+def _names(entities):
+    return ", ".join(e.name for e in entities if hasattr(e, "name")) or "Thing"
+
+
+def _add_class(ctx, cls):
+    parents = [c for c in cls.is_a if isinstance(c, ThingClass)]
+    suffix = f" (subclass of {_names(parents)})" if parents else ""
+    ctx.add("Classes", cls, f" - {cls.name}{suffix}")
+
+
+def _add_individual(ctx, ind):
+    types = [c for c in ind.is_a if isinstance(c, ThingClass)]
+    ctx.add("Individuals", ind, f" - {ind.name} (Type: {_names(types[:1]) if types else 'Unknown'})")
+
+
+def _add_property(ctx, prop):
+    ctx.add("Object Properties", prop,
+            f" - {prop.name} (domain: {_names(prop.domain)}, range: {_names(prop.range)})")
+
+
+def _add_relation(ctx, subject, prop, obj):
+    ctx.add("Relations", (subject, prop, obj), f" - {subject.name}.{prop.name}({obj.name})")
+
+
+def _expand(ctx, onto, entity):
+    """Add an entity and its bounded neighbourhood."""
+    if isinstance(entity, ObjectPropertyClass):
+        _add_property(ctx, entity)
+        for cls in list(entity.domain) + list(entity.range):
+            if isinstance(cls, ThingClass):
+                _add_class(ctx, cls)
+    elif isinstance(entity, ThingClass):
+        _add_class(ctx, entity)
+        for parent in entity.is_a:
+            if isinstance(parent, ThingClass):
+                _add_class(ctx, parent)
+        for ind, in sparql_query(onto, _INSTANCES, (entity,)):
+            _add_individual(ctx, ind)
+        for prop, in sparql_query(onto, _CLASS_PROPERTIES, (entity,)):
+            _add_property(ctx, prop)
+    elif hasattr(entity, "is_a"):
+        _add_individual(ctx, entity)
+        for cls in entity.is_a:
+            if isinstance(cls, ThingClass):
+                _add_class(ctx, cls)
+        outgoing = ((entity, prop, value) for prop, value in sparql_query(onto, _OUTGOING, (entity,)))
+        incoming = ((subject, prop, entity) for subject, prop in sparql_query(onto, _INCOMING, (entity,)))
+        for relations in (outgoing, incoming):
+            for subject, prop, obj in relations:
+                if not hasattr(obj, "name") or not hasattr(subject, "name"):
+                    continue
+                _add_relation(ctx, subject, prop, obj)
+                _add_property(ctx, prop)
+                _add_individual(ctx, obj if subject is entity else subject)
+
+
+def build_ontology_context(onto, user_input, logical_form=None, max_tokens=ONTOLOGY_CONTEXT_TOKENS):
+    """
+    Ontology context for a prompt: the entities relevant to the question, within a token budget.
+
+    Args:
+        onto: The loaded ontology.
+        user_input (str): The user's question.
+        logical_form (str): The predicted logical form (its entities come first).
+        max_tokens (int): Token budget of the returned text.
+
+    Returns:
+        str: The context, in the layout of get_ontology_info(). Without any match, the
+             schema (classes and object properties) is listed instead, within the same budget.
+    """
+    ctx = _Context(max_tokens)
+    seeds = find_mentions(onto, logical_form or "") + find_mentions(onto, user_input)
+    seeds = list(dict.fromkeys(seeds))
+    if seeds:
+        # Seeds themselves first, then their neighbourhoods.
+        for entity in seeds:
+            if isinstance(entity, ObjectPropertyClass):
+                _add_property(ctx, entity)
+            elif isinstance(entity, ThingClass):
+                _add_class(ctx, entity)
+            elif hasattr(entity, "is_a"):
+                _add_individual(ctx, entity)
+        for entity in seeds:
+            _expand(ctx, onto, entity)
+        return ctx.render("Ontology Information (relevant to the question):")
+
+    for prop in onto.world.object_properties():
+        _add_property(ctx, prop)
+    for cls in onto.world.classes():
+        _add_class(ctx, cls)
+    return ctx.render("Ontology Information:")
+
+
+# For quick testing and direct module execution:
+if __name__ == "__main__":
+    from neuro_symbolic.ontology_engine import load_ontology
+
+    ontology = load_ontology()
+    print(build_ontology_context(ontology, "Can the oil pump cause failure of the oil engine?",
+                                 "oil_pump_1.CausesFailure(oil_engine_1)"))
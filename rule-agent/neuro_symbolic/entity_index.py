@@ -0,0 +1,121 @@
+"""
+entity_index.py
+
+Purpose:
+---------
+- Map local names (the part of an IRI after "#") to ontology entities with a hash index,
+  instead of a wildcard IRI search (onto.search_one(iri="*#" + name)) per lookup.
+- Build the index once per owlready2 world and rebuild it when entities were added to the
+  world in place (e.g. by the online slot model) or the ontology is updated.
+
+The index is built with a single query over the quadstore (every resource that has an
+rdf:type, i.e. classes, properties and individuals) and holds store ids only; entities are
+materialized on lookup, so it stays small for ontologies with hundreds of thousands of
+individuals.
+"""
+
+import re
+import threading
+import weakref
+
+from owlready2.base import rdf_type
+
+_CAMEL = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+
+
+def _resource_counter(world):
+    """Last store id allocated by the world; it grows whenever a new IRI is added."""
+    return world.graph.execute("SELECT current_resource FROM store").fetchone()[0]
+
+
+def label_of(name):
+    """
+    Natural-language label of a local name: "OilEngine" -> "oil engine", "piston_1" -> "piston".
+    """
+    words = [w.lower() for w in _CAMEL.findall(name) if not w.isdigit()]
+    return " ".join(words)
+
+
+class EntityIndex:
+    """Local name -> entity lookups for one owlready2 world."""
+
+    def __init__(self, world):
+        self.world = world
+        self.storids = {}
+        self._labels = None
+        self.resource_counter = _resource_counter(world)
+        rows = world.graph.db.execute(
+            "SELECT DISTINCT resources.storid, resources.iri FROM resources "
+            "JOIN objs ON objs.s = resources.storid WHERE objs.p = ? ORDER BY resources.storid",
+            (rdf_type,),
+        )
+        for storid, iri in rows:
+            if "#" in iri:
+                # Like search_one(iri="*#name"), the first match wins.
+                self.storids.setdefault(iri.rsplit("#", 1)[1], storid)
+
+    def get(self, name):
+        """
+        Return the entity whose IRI ends with "#" + name, or None.
+
+        Args:
+            name (str): The local name (e.g. "piston_1" or "CausesFailure").
+        """
+        storid = self.storids.get(name)
+        if storid is None:
+            return None
+        return self.world._get_by_storid(storid)
+
+    @property
+    def labels(self):
+        """Label (see label_of) -> store ids of the entities with that label, built on first use."""
+        if self._labels is None:
+            labels = {}
+            for name, storid in self.storids.items():
+                label = label_of(name)
+                if label:
+                    labels.setdefault(label, []).append(storid)
+            self._labels = labels
+        return self._labels
+
+    def entity(self, storid):
+        return self.world._get_by_storid(storid)
+
+    def __contains__(self, name):
+        return name in self.storids
+
+    def __len__(self):
+        return len(self.storids)
+
+
+_indexes = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def get_entity_index(onto):
+    """
+    Return the entity index of the world the ontology belongs to, building it if needed
+    and rebuilding it if new IRIs were added to the world since it was built.
+
+    Args:
+        onto: An owlready2 ontology (or world).
+    """
+    world = getattr(onto, "world", onto)
+    index = _indexes.get(world)
+    if index is None or index.resource_counter != _resource_counter(world):
+        with _lock:
+            index = _indexes.get(world)
+            if index is None or index.resource_counter != _resource_counter(world):
+                index = _indexes[world] = EntityIndex(world)
+    return index
+
+
+def invalidate_entity_index(onto):
+    """
+    Drop the entity index of the ontology's world; call it after the ontology is updated.
+
+    Args:
+        onto: An owlready2 ontology (or world).
+    """
+    with _lock:
+        _indexes.pop(getattr(onto, "world", onto), None)
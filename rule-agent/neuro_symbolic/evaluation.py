@@ -11,6 +11,35 @@ Purpose:
 import re
 from owlready2 import *
 
+from neuro_symbolic.entity_index import get_entity_index
+
+# Logical statement format: subject.property(object)
+STATEMENT_PATTERN = re.compile(r"^(\w+)\.(\w+)\((\w+)\)$")
+FORMAT_ERROR = "Logical statement format is incorrect. Expected format: subject.property(object)"
+
+
+def parse_statement(logical_statement: str):
+    """
+    Parse "subject.property(object)" or "not subject.property(object)".
+
+    Args:
+        logical_statement (str): The logical statement to parse.
+
+    Returns:
+        tuple(bool, str, str, str) or None: (is_negated, subject, property, object), or None
+                                            if the statement is not well formed.
+    """
+    ls = logical_statement.strip()
+    is_negated = False
+    if ls.lower().startswith("not "):
+        is_negated = True
+        ls = ls[4:].strip()
+    match = STATEMENT_PATTERN.match(ls)
+    if not match:
+        return None
+    return (is_negated,) + match.groups()
+
+
 def check_statement_with_details(onto, logical_statement: str):
     """
     Evaluates whether the given logical statement is true or false in the ontology and provides detailed feedback.
@@ -26,24 +55,18 @@ def check_statement_with_details(onto, logical_statement: str):
                                    as true (or false in the case of negation) and the second element is
                                    an explanation string if the evaluation fails (or None if it passes).
     """
-    # Clean up and check for negation.
-    ls = logical_statement.strip()
-    is_negated = False
-    if ls.lower().startswith("not "):
-        is_negated = True
-        ls = ls[4:].strip()
+    # Expect format: [not] subject.property(object)
+    parsed = parse_statement(logical_statement)
+    if parsed is None:
+        return False, FORMAT_ERROR
 
-    # Expect format: subject.property(object)
-    match = re.match(r"^(\w+)\.(\w+)\((\w+)\)$", ls)
-    if not match:
-        return False, "Logical statement format is incorrect. Expected format: subject.property(object)"
-    
-    subject_name, property_name, object_name = match.groups()
+    is_negated, subject_name, property_name, object_name = parsed
     
-    # Look up elements in the ontology.
-    subject = onto.search_one(iri="*#" + subject_name)
-    obj = onto.search_one(iri="*#" + object_name)
-    prop = onto.search_one(iri="*#" + property_name)
+    # Look up elements in the ontology (hash index by local name, built once per ontology).
+    index = get_entity_index(onto)
+    subject = index.get(subject_name)
+    obj = index.get(object_name)
+    prop = index.get(property_name)
     
     if not subject:
         return False, f"Subject '{subject_name}' not found in the ontology."
@@ -126,7 +149,7 @@ def generate_evaluation_results(user_input: str, logical_form: str, evaluation_r
     return result_summary
 
 
-# Optionally, you can add more helper functions here for batch processing etc.
+# Batch processing of large statement streams: see neuro_symbolic.batch_evaluation.
 
 # -----------------------------------------------------------------------------
 # Example Testing Block
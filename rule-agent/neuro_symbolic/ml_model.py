@@ -4,14 +4,25 @@ ml_model.py
 Purpose:
 ---------
 - Generate training data from the ontology (functions like training_data_generator()).
-- Train an ML model (using scikit-learn’s LogisticRegression as an example).
+- Train an ML model (per-slot scikit-learn LogisticRegression classifiers, see SlotModel).
 - Convert natural language input into logical forms (with function convert_to_logical()).
 """
 
+import os
 import re
+
+import numpy as np
 from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.dummy import DummyClassifier
 from sklearn.linear_model import LogisticRegression
 
+from neuro_symbolic.evaluation import parse_statement
+
+# Negative examples per property used by modelizer() (default: every unrelated pair).
+TRAINING_NEGATIVE_SAMPLE = int(os.getenv("TRAINING_NEGATIVE_SAMPLE", "0")) or None
+# "batch" (SlotModel, retrained on changes) or "incremental" (see online_model.OnlineSlotModel).
+TRAINING_MODE = os.getenv("TRAINING_MODE", "batch")
+
 # Helper functions for verbalization
 
 def verbalize_individual(individual):
@@ -49,7 +60,67 @@ def get_all_elements(onto):
 
 # Training data generation
 
-def training_data_generator(onto):
+def _membership_mask(classes, position):
+    """Boolean mask over the individuals: True for instances of any of the classes."""
+    mask = np.zeros(len(position), dtype=bool)
+    for cls in classes:
+        if hasattr(cls, "instances"):
+            rows = [position[ind] for ind in cls.instances() if ind in position]
+            mask[rows] = True
+    return mask
+
+
+def _property_examples(prop, individuals, position, labels, negative_sample, rng):
+    """Examples of one property, by subject, with domain/range filtering done on masks."""
+    subjects = np.flatnonzero(_membership_mask(prop.domain, position))
+    objects = np.flatnonzero(_membership_mask(prop.range, position))
+    if not len(subjects) or not len(objects):
+        return
+    phrase = verbalize_property(prop)
+
+    # Relation adjacency, restricted to the candidate objects.
+    related = {}
+    for s in subjects:
+        targets = [position[o] for o in prop[individuals[s]] if o in position]
+        if targets:
+            related[s] = set(targets)
+
+    def example(s, o, is_true):
+        logical_form = f"{individuals[s].name}.{prop.name}({individuals[o].name})"
+        if is_true:
+            return (f"{labels[s]} {phrase} {labels[o]}", logical_form)
+        return (f"{labels[s]} does not {phrase} {labels[o]}", f"not {logical_form}")
+
+    if negative_sample is None:
+        # Every subject/object pair, in the order of the individuals.
+        for s in subjects:
+            targets = related.get(s, ())
+            for o in objects:
+                yield example(s, o, o in targets)
+        return
+
+    # All positives, plus at most negative_sample negatives drawn at random.
+    is_object = np.zeros(len(individuals), dtype=bool)
+    is_object[objects] = True
+    for s, targets in related.items():
+        for o in sorted(targets):
+            if is_object[o]:
+                yield example(s, o, True)
+    total = len(subjects) * len(objects)
+    positives = sum(int(is_object[list(t)].sum()) for t in related.values())
+    wanted = min(negative_sample, total - positives)
+    drawn = set()
+    while len(drawn) < wanted:
+        for flat in rng.integers(0, total, size=2 * (wanted - len(drawn))):
+            s, o = subjects[flat // len(objects)], objects[flat % len(objects)]
+            if o not in related.get(s, ()) and flat not in drawn:
+                drawn.add(flat)
+                yield example(s, o, False)
+                if len(drawn) == wanted:
+                    break
+
+
+def training_data_generator(onto, stream=False, negative_sample=None, seed=0):
     """
     Generate training data based on the ontology.
     
@@ -57,78 +128,219 @@ def training_data_generator(onto):
     property's domain and range) and produce examples:
       - A positive example if the relationship exists.
       - A negative example (prefixed with "not") if it does not.
+
+    Domain and range membership are computed once per class as masks over the individuals, and
+    each subject's relations are read once, instead of testing every pair.
+
+    Args:
+        onto: The owlready2 ontology.
+        stream (bool): Return a generator instead of a list.
+        negative_sample (int): If set, at most this many negative examples per property, drawn
+                               at random, instead of one for every unrelated pair.
+        seed (int): Random seed of the negative sample.
     
     Returns:
-        data: A list of tuples (natural_language_statement, logical_form)
+        data: A list (or generator) of tuples (natural_language_statement, logical_form)
     """
-    data = []
     elements = get_all_elements(onto)
     individuals = elements["individuals"]
     properties = elements["properties"]
-    
-    for prop in properties:
-        # Only process properties that have defined domain and range
-        if not (hasattr(prop, "domain") and hasattr(prop, "range")):
-            continue
-        
-        # Loop over every potential subject/object pair
-        for subj in individuals:
-            for obj in individuals:
-                # Check if subject belongs to one of the property's domain classes
-                # and if object belongs to one of the property's range classes.
-                domain_match = any(isinstance(subj, domain) for domain in prop.domain)
-                range_match = any(isinstance(obj, range_) for range_ in prop.range)
-                if domain_match and range_match:
-                    # Build the logical form
-                    logical_form = f"{subj.name}.{prop.name}({obj.name})"
-                    # Check if the relationship actually exists in the ontology.
-                    is_true = obj in prop[subj]
-                    
-                    if is_true:
-                        nl_statement = f"{verbalize_individual(subj)} {verbalize_property(prop)} {verbalize_individual(obj)}"
-                        data.append((nl_statement, logical_form))
-                    else:
-                        # For false relationships, optionally add a negated example.
-                        nl_statement_negative = f"{verbalize_individual(subj)} does not {verbalize_property(prop)} {verbalize_individual(obj)}"
-                        logical_form_negative = f"not {logical_form}"
-                        data.append((nl_statement_negative, logical_form_negative))
-                    
-    return data
+    position = {ind: i for i, ind in enumerate(individuals)}
+    labels = [verbalize_individual(ind) for ind in individuals]
+    rng = np.random.default_rng(seed)
+
+    def generate():
+        for prop in properties:
+            # Only process properties that have defined domain and range
+            if not (hasattr(prop, "domain") and hasattr(prop, "range")):
+                continue
+            yield from _property_examples(prop, individuals, position, labels, negative_sample, rng)
+
+    return generate() if stream else list(generate())
 
 # Model training functions
 
+class SlotModel:
+    """
+    Structured logical-form predictor: negation, subject, property and object are
+    predicted by separate classifiers and assembled into "[not ]subject.property(object)".
+
+    The number of classes grows with the number of individuals and properties, instead of
+    with the number of distinct logical forms (every subject/object pair). Subject and object
+    are chosen among the individuals seen with the predicted property, so the assembled form
+    respects its domain and range.
+    """
+
+    SLOTS = ("negation", "subject", "property", "object")
+
+    def __init__(self, max_iter=1000):
+        self.max_iter = max_iter
+        self.classifiers = {}
+        self.allowed = {}
+
+    def _classifier(self, labels):
+        if len(set(labels)) < 2:
+            return DummyClassifier(strategy="most_frequent")
+        return LogisticRegression(max_iter=self.max_iter)
+
+    def fit(self, X, logical_forms):
+        parsed = [parse_statement(lf) for lf in logical_forms]
+        if any(p is None for p in parsed):
+            raise ValueError("Training labels must be logical forms: [not ]subject.property(object)")
+        for slot, labels in zip(self.SLOTS, zip(*parsed)):
+            self.classifiers[slot] = self._classifier(labels).fit(X, list(labels))
+
+        # Per property: which subject / object classes it was seen with.
+        subjects = {c: i for i, c in enumerate(self.classifiers["subject"].classes_)}
+        objects = {c: i for i, c in enumerate(self.classifiers["object"].classes_)}
+        properties = self.classifiers["property"].classes_
+        self.allowed = {
+            "subject": np.zeros((len(properties), len(subjects)), dtype=bool),
+            "object": np.zeros((len(properties), len(objects)), dtype=bool),
+        }
+        prop_index = {c: i for i, c in enumerate(properties)}
+        for _, subj, prop, obj in parsed:
+            self.allowed["subject"][prop_index[prop], subjects[subj]] = True
+            self.allowed["object"][prop_index[prop], objects[obj]] = True
+        return self
+
+    def slot_log_probabilities(self, X):
+        """Log-probabilities of each slot's classes, one (n_statements, n_classes) array per slot."""
+        with np.errstate(divide="ignore"):
+            return {slot: np.log(clf.predict_proba(X)) for slot, clf in self.classifiers.items()}
+
+    def predict(self, X):
+        scores = self.slot_log_probabilities(X)
+        prop = scores["property"].argmax(axis=1)
+        chosen = {"property": prop, "negation": scores["negation"].argmax(axis=1)}
+        for slot in ("subject", "object"):
+            masked = np.where(self.allowed[slot][prop], scores[slot], -np.inf)
+            chosen[slot] = masked.argmax(axis=1)
+        names = {slot: self.classifiers[slot].classes_[chosen[slot]] for slot in self.SLOTS}
+        return np.array([
+            f"{'not ' if neg else ''}{subj}.{prop}({obj})"
+            for neg, subj, prop, obj in zip(*(names[slot] for slot in self.SLOTS))
+        ])
+
+    def predict_top_k(self, X, k=3):
+        """
+        The k most probable logical forms of each statement.
+
+        A candidate's probability is the product of its slot probabilities. Candidates are
+        combined from the k best classes of each slot, subject and object restricted to
+        those seen with the property.
+
+        Returns:
+            List[List[tuple(str, float)]]: Per statement, (logical_form, probability) pairs,
+                                           most probable first.
+        """
+        scores = self.slot_log_probabilities(X)
+        n = X.shape[0]
+        classes = {slot: self.classifiers[slot].classes_ for slot in self.SLOTS}
+        top_props = np.argsort(-scores["property"], axis=1)[:, :k]
+        top_neg = np.argsort(-scores["negation"], axis=1)[:, :k]
+        candidates = [[] for _ in range(n)]
+        rows = np.arange(n)[:, None]
+        for column in range(top_props.shape[1]):
+            prop = top_props[:, column]
+            best = {}
+            for slot in ("subject", "object"):
+                masked = np.where(self.allowed[slot][prop], scores[slot], -np.inf)
+                order = np.argsort(-masked, axis=1)[:, :k]
+                best[slot] = (order, masked[rows, order])
+            base = scores["property"][np.arange(n), prop]
+            for i in range(n):
+                for neg in top_neg[i]:
+                    for subj, subj_score in zip(*(b[i] for b in best["subject"])):
+                        for obj, obj_score in zip(*(b[i] for b in best["object"])):
+                            score = base[i] + scores["negation"][i, neg] + subj_score + obj_score
+                            if np.isfinite(score):
+                                candidates[i].append((score, neg, subj, prop[i], obj))
+        results = []
+        for found in candidates:
+            found.sort(key=lambda c: -c[0])
+            results.append([
+                (f"{'not ' if classes['negation'][neg] else ''}{classes['subject'][subj]}."
+                 f"{classes['property'][prop]}({classes['object'][obj]})", float(np.exp(score)))
+                for score, neg, subj, prop, obj in found[:k]
+            ])
+        return results
+
+
 def model_generator(training_data):
     """
-    Train a logistic regression model to map natural language statements to logical forms.
+    Train a slot-based model (see SlotModel) to map natural language statements to logical forms.
     
     Args:
         training_data: A list of tuples (natural_language_statement, logical_form)
         
     Returns:
-        model: A trained LogisticRegression model.
-        vectorizer: A CountVectorizer fitted to the natural language statements.
+        model: A trained SlotModel.
+        vectorizer: A CountVectorizer (words and word pairs) fitted to the natural language statements.
     """
-    vectorizer = CountVectorizer()
+    # Word pairs ("piston causes", "of piston") tell the subject from the object.
+    vectorizer = CountVectorizer(ngram_range=(1, 2))
     X_train = vectorizer.fit_transform([pair[0] for pair in training_data])
     y_train = [pair[1] for pair in training_data]
     
-    model = LogisticRegression(max_iter=1000)
+    model = SlotModel(max_iter=1000)
     model.fit(X_train, y_train)
     return model, vectorizer
 
-def modelizer(onto):
+def training_config():
+    """
+    The settings that determine the trained model (part of the model cache key).
+    """
+    if TRAINING_MODE == "incremental":
+        from neuro_symbolic.online_model import ONLINE_EPOCHS, ONLINE_N_FEATURES
+
+        return {
+            "negative_sample": TRAINING_NEGATIVE_SAMPLE,
+            "vectorizer": f"HashingVectorizer(n_features={ONLINE_N_FEATURES}, ngram_range=(1, 2))",
+            "model": f"OnlineSlotModel(SGDClassifier(loss='log_loss'), epochs={ONLINE_EPOCHS})",
+        }
+    return {
+        "negative_sample": TRAINING_NEGATIVE_SAMPLE,
+        "vectorizer": "CountVectorizer(ngram_range=(1, 2))",
+        "model": "SlotModel(LogisticRegression(max_iter=1000))",
+    }
+
+def modelizer(onto, use_cache=True):
     """
     Generate training data from the ontology and train the ML model.
+
+    The trained model is cached on disk (see model_cache), keyed by the ontology content and
+    training_config(), so an unchanged ontology is not trained on again.
     
     Args:
         onto: The owlready2 ontology which has been initialized and updated.
+        use_cache (bool): Whether to load (and store) the model in the cache.
     
     Returns:
-        model: The trained LogisticRegression model.
-        vectorizer: The fitted CountVectorizer used for text transformation.
+        model: The trained SlotModel (an OnlineSlotModel in incremental TRAINING_MODE).
+        vectorizer: The fitted CountVectorizer (HashingVectorizer) used for text transformation.
     """
-    training_data = training_data_generator(onto)
-    model, vectorizer = model_generator(training_data)
+    from neuro_symbolic.model_cache import load_model, model_cache_key, save_model
+
+    config = training_config()
+    if use_cache:
+        key = model_cache_key(onto, config)
+        cached = load_model(key, config)
+        if cached is not None:
+            print("Loaded trained model from cache:", key)
+            return cached
+
+    if TRAINING_MODE == "incremental":
+        from neuro_symbolic.online_model import OnlineSlotModel
+
+        model = OnlineSlotModel()
+        model.fit_ontology(onto, negative_sample=TRAINING_NEGATIVE_SAMPLE)
+        vectorizer = model.vectorizer
+    else:
+        training_data = training_data_generator(onto, negative_sample=TRAINING_NEGATIVE_SAMPLE)
+        model, vectorizer = model_generator(training_data)
+    if use_cache:
+        save_model(key, config, model, vectorizer)
     return model, vectorizer
 
 def convert_to_logical(statement, model, vectorizer):
@@ -137,7 +349,7 @@ def convert_to_logical(statement, model, vectorizer):
     
     Args:
         statement (str): A natural language input statement.
-        model: The trained LogisticRegression model.
+        model: The trained SlotModel.
         vectorizer: The fitted CountVectorizer.
     
     Returns:
@@ -148,6 +360,28 @@ def convert_to_logical(statement, model, vectorizer):
     logical_form = predicted[0]
     return logical_form
 
+def convert_to_logical_batch(statements, model, vectorizer, top_k=3):
+    """
+    Convert many natural language statements at once, with the top-k logical forms of each.
+
+    The statements are vectorized in a single transform() call and scored together, so
+    callers can validate several candidates per statement against the ontology in one pass.
+
+    Args:
+        statements (List[str]): Natural language input statements.
+        model: The trained SlotModel.
+        vectorizer: The fitted CountVectorizer.
+        top_k (int): Candidates returned per statement.
+
+    Returns:
+        List[List[tuple(str, float)]]: Per statement, (logical_form, probability) pairs,
+                                       most probable first.
+    """
+    if not statements:
+        return []
+    X_test = vectorizer.transform(statements)
+    return model.predict_top_k(X_test, top_k)
+
 # Example testing block.
 if __name__ == "__main__":
     # For testing this module, you should load your ontology (e.g., via ontology_engine.create_ontology())
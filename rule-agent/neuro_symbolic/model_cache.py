@@ -0,0 +1,124 @@
+"""
+model_cache.py
+
+Purpose:
+---------
+- Persist the trained NL-to-logic model (estimator and vectorizer) on disk, keyed by a hash
+  of the content of every loaded ontology (imports and secondary files included) and of
+  the training configuration, so a restart with an unchanged ontology loads the model
+  instead of regenerating data and retraining.
+- Take the content hash of an ontology store from the file hashes it recorded, so a warm
+  start does not serialize the whole (possibly very large) world.
+- Store artifacts with joblib, uncompressed, so their NumPy arrays (e.g. the coefficient
+  matrix) are memory-mapped on load instead of read into memory.
+
+Every artifact records the cache format version and the configuration it was trained
+with; an artifact that does not match (or cannot be read) is ignored and replaced.
+
+Configuration:
+    MODEL_CACHE_DIR    Directory of the artifacts (default .ontology_cache/models).
+    MODEL_CACHE_KEEP   Artifacts kept, most recently used first (default 5).
+"""
+
+import hashlib
+import json
+import os
+
+import joblib
+import sklearn
+
+from neuro_symbolic.ontology_engine import ONTOLOGY_CACHE_DIR, world_hash
+from neuro_symbolic.ontology_store import store_hash
+
+MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR", os.path.join(ONTOLOGY_CACHE_DIR, "models"))
+MODEL_CACHE_KEEP = int(os.getenv("MODEL_CACHE_KEEP", "5"))
+# Bump when the layout of the stored artifact changes.
+MODEL_CACHE_VERSION = 1
+
+
+def model_cache_key(onto, config):
+    """
+    Cache key of a model trained on the ontology with the given configuration.
+
+    Args:
+        onto: The ontology the training data is generated from (with every ontology of its
+              world: a change to an imported or secondary ontology changes the key). Worlds
+              of an ontology store are hashed with store_hash(), others with world_hash().
+        config (dict): JSON-serializable training configuration (see ml_model.training_config()).
+
+    Returns:
+        str: A hex SHA-256 digest.
+    """
+    content = store_hash(onto) or world_hash(onto)
+    digest = hashlib.sha256(content.encode("utf-8"))
+    digest.update(json.dumps(_versioned(config), sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _versioned(config):
+    return dict(config, cache_version=MODEL_CACHE_VERSION, sklearn=sklearn.__version__)
+
+
+def _artifact_path(key):
+    return os.path.join(MODEL_CACHE_DIR, key + ".joblib")
+
+
+def load_model(key, config):
+    """
+    Load a cached model.
+
+    Args:
+        key (str): See model_cache_key().
+        config (dict): The training configuration the artifact must have been trained with.
+
+    Returns:
+        tuple(model, vectorizer) or None: The cached model, or None if there is no valid artifact.
+    """
+    path = _artifact_path(key)
+    if not os.path.exists(path):
+        return None
+    try:
+        artifact = joblib.load(path, mmap_mode="r")
+    except Exception as exc:  # noqa: BLE001
+        print("⚠️  Ignoring unreadable model artifact:", path, exc)
+        return None
+    if not isinstance(artifact, dict) or artifact.get("config") != _versioned(config):
+        return None
+    os.utime(path)  # Most recently used, for pruning.
+    return artifact["model"], artifact["vectorizer"]
+
+
+def save_model(key, config, model, vectorizer):
+    """
+    Store a trained model under its key (atomically) and prune old artifacts.
+
+    Args:
+        key (str): See model_cache_key().
+        config (dict): The training configuration.
+        model: The trained estimator.
+        vectorizer: The fitted vectorizer.
+    """
+    os.makedirs(MODEL_CACHE_DIR, exist_ok=True)
+    path = _artifact_path(key)
+    artifact = {"config": _versioned(config), "model": model, "vectorizer": vectorizer}
+    # Uncompressed: compressed arrays cannot be memory-mapped.
+    joblib.dump(artifact, path + ".tmp")
+    os.replace(path + ".tmp", path)
+    _prune()
+
+
+def _prune():
+    artifacts = [os.path.join(MODEL_CACHE_DIR, f) for f in os.listdir(MODEL_CACHE_DIR) if f.endswith(".joblib")]
+    artifacts.sort(key=os.path.getmtime, reverse=True)
+    for path in artifacts[MODEL_CACHE_KEEP:]:
+        os.remove(path)
+
+
+# For quick testing and direct module execution:
+if __name__ == "__main__":
+    from neuro_symbolic.ml_model import modelizer
+    from neuro_symbolic.ontology_engine import load_ontology
+
+    ontology = load_ontology()
+    modelizer(ontology)
+    print("Cached models:", os.listdir(MODEL_CACHE_DIR))
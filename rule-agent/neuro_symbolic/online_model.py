@@ -0,0 +1,234 @@
+"""
+online_model.py
+
+Purpose:
+---------
+- Incremental training mode of the NL-to-logic model: a slot model (see ml_model.SlotModel)
+  of SGD classifiers over a fixed-size hashed feature space, updated with partial_fit().
+- Keep the model current on ontology updates by training only on the examples whose
+  label changed (added or removed facts) or that are new (new individuals, or individuals
+  that entered a property's domain or range), so an update costs time proportional to the
+  change instead of a full retraining.
+
+The model keeps a snapshot of the facts it was trained on (per property: the subjects in
+its domain, the objects in its range and the related pairs) and compares the updated
+ontology with it. New subjects, objects or properties become new classes of their slot.
+Individuals that leave the ontology are no longer predicted (they cannot be unlearned).
+
+Configuration:
+    TRAINING_MODE        "incremental" to train this model in modelizer() (default "batch").
+    ONLINE_N_FEATURES    Size of the hashed feature space (default 2**14).
+    ONLINE_EPOCHS        SGD passes over the examples of a training or update (default 5).
+"""
+
+import os
+import threading
+
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+
+from neuro_symbolic.ml_model import SlotModel, training_data_generator, verbalize_individual, verbalize_property
+
+ONLINE_N_FEATURES = int(os.getenv("ONLINE_N_FEATURES", str(2 ** 14)))
+ONLINE_EPOCHS = int(os.getenv("ONLINE_EPOCHS", "5"))
+
+# Placeholder class of a slot with a single known class (SGD needs two).
+_UNSEEN = "<unseen>"
+
+
+def hashing_vectorizer(n_features=ONLINE_N_FEATURES):
+    """Stateless vectorizer (words and word pairs): nothing to refit when the vocabulary grows."""
+    return HashingVectorizer(n_features=n_features, ngram_range=(1, 2), alternate_sign=False, dtype=np.float32)
+
+
+def take_snapshot(onto):
+    """
+    The facts the training examples are generated from.
+
+    Returns:
+        dict: "labels": the verbalized label of every individual, "properties": per property
+              name, (domain names, range names, related (subject, object) pairs, phrase).
+    """
+    individuals = list(onto.individuals())
+    names = {ind.name for ind in individuals}
+    snapshot = {"labels": {ind.name: verbalize_individual(ind) for ind in individuals}, "properties": {}}
+    for prop in onto.object_properties():
+        members = []
+        for classes in (prop.domain, prop.range):
+            members.append({ind.name for cls in classes if hasattr(cls, "instances")
+                            for ind in cls.instances() if ind.name in names})
+        domain, range_ = members
+        related = {(s.name, o.name) for s in onto.individuals() if s.name in domain
+                   for o in prop[s] if getattr(o, "name", None) in range_}
+        snapshot["properties"][prop.name] = (frozenset(domain), frozenset(range_), frozenset(related), verbalize_property(prop))
+    return snapshot
+
+
+def changed_examples(old, new):
+    """
+    Training examples of the facts that differ between two snapshots.
+
+    Returns:
+        List[tuple(str, str)]: (natural_language_statement, logical_form) pairs.
+    """
+    labels = new["labels"]
+    examples = []
+    for prop, (domain, range_, related, phrase) in new["properties"].items():
+        old_domain, old_range, old_related, _ = old["properties"].get(prop, (frozenset(), frozenset(), frozenset(), phrase))
+        pairs = {(s, o) for s in domain - old_domain for o in range_}
+        pairs |= {(s, o) for s in domain & old_domain for o in range_ - old_range}
+        # Pairs that were already candidates, but whose relation was added or removed.
+        pairs |= {(s, o) for s, o in related ^ old_related
+                  if s in domain and o in range_ and s in old_domain and o in old_range}
+        for s, o in sorted(pairs):
+            logical_form = f"{s}.{prop}({o})"
+            if (s, o) in related:
+                examples.append((f"{labels[s]} {phrase} {labels[o]}", logical_form))
+            else:
+                examples.append((f"{labels[s]} does not {phrase} {labels[o]}", f"not {logical_form}"))
+    return examples
+
+
+def _add_classes(clf, labels):
+    """Add classes to a fitted SGDClassifier, with zero weights."""
+    new = sorted(set(labels) - set(clf.classes_))
+    if not new:
+        return
+    coef, intercept = np.array(clf.coef_), np.array(clf.intercept_)
+    if len(clf.classes_) == 2:
+        # Binary weights score classes_[1] against classes_[0]: one row per class instead.
+        coef, intercept = np.vstack([-coef, coef]), np.concatenate([-intercept, intercept])
+    clf.coef_ = np.vstack([coef, np.zeros((len(new), coef.shape[1]), dtype=coef.dtype)])
+    clf.intercept_ = np.concatenate([intercept, np.zeros(len(new), dtype=intercept.dtype)])
+    clf.classes_ = np.concatenate([clf.classes_, np.array(new, dtype=clf.classes_.dtype)])
+
+
+class OnlineSlotModel(SlotModel):
+    """SlotModel trained with partial_fit(), updated from ontology changes (see update())."""
+
+    def __init__(self, vectorizer=None, epochs=ONLINE_EPOCHS, alpha=1e-5, seed=0):
+        super().__init__()
+        self.vectorizer = vectorizer or hashing_vectorizer()
+        self.epochs = epochs
+        self.alpha = alpha
+        self.rng = np.random.default_rng(seed)
+        self.snapshot = {"labels": {}, "properties": {}}
+        self._lock = threading.RLock()
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    def partial_fit(self, X, logical_forms):
+        """Train the slot classifiers for self.epochs passes over the examples."""
+        slots = list(zip(*(self._parse(lf) for lf in logical_forms)))
+        for slot, labels in zip(self.SLOTS, slots):
+            # Names as objects, so that longer names can be added as classes later.
+            dtype = bool if slot == "negation" else object
+            labels = np.array(labels, dtype=dtype)
+            clf = self.classifiers.get(slot)
+            first = {}
+            if clf is None:
+                classes = [False, True] if slot == "negation" else sorted(set(labels) | {_UNSEEN})
+                clf = self.classifiers[slot] = SGDClassifier(loss="log_loss", alpha=self.alpha, random_state=0)
+                first = {"classes": np.array(classes, dtype=dtype)}
+            else:
+                if not clf.coef_.flags.writeable:
+                    # Memory-mapped from the model cache.
+                    clf.coef_, clf.intercept_ = np.array(clf.coef_), np.array(clf.intercept_)
+                _add_classes(clf, labels)
+            for _ in range(self.epochs):
+                order = self.rng.permutation(X.shape[0])
+                clf.partial_fit(X[order], labels[order], **first)
+                first = {}
+        return self
+
+    @staticmethod
+    def _parse(logical_form):
+        from neuro_symbolic.evaluation import parse_statement
+
+        parsed = parse_statement(logical_form)
+        if parsed is None:
+            raise ValueError("Training labels must be logical forms: [not ]subject.property(object)")
+        return parsed
+
+    def _refresh_allowed(self):
+        """Subjects and objects each property may be assembled with, from the snapshot."""
+        index = {slot: {c: i for i, c in enumerate(self.classifiers[slot].classes_)}
+                 for slot in ("subject", "object", "property")}
+        self.allowed = {slot: np.zeros((len(index["property"]), len(index[slot])), dtype=bool)
+                        for slot in ("subject", "object")}
+        for prop, facts in self.snapshot["properties"].items():
+            if prop not in index["property"]:
+                continue
+            for slot, names in zip(("subject", "object"), facts[:2]):
+                rows = [index[slot][n] for n in names if n in index[slot]]
+                self.allowed[slot][index["property"][prop], rows] = True
+
+    def _train(self, examples):
+        if examples:
+            X = self.vectorizer.transform([nl for nl, _ in examples])
+            self.partial_fit(X, [lf for _, lf in examples])
+            self._refresh_allowed()
+        return len(examples)
+
+    def fit_ontology(self, onto, negative_sample=None):
+        """Full training on the ontology's examples (see ml_model.training_data_generator)."""
+        with self._lock:
+            self.snapshot = take_snapshot(onto)
+            return self._train(training_data_generator(onto, negative_sample=negative_sample))
+
+    def update(self, onto):
+        """
+        Train on the examples that changed since the last training.
+
+        Args:
+            onto: The updated ontology.
+
+        Returns:
+            int: The number of examples trained on.
+        """
+        snapshot = take_snapshot(onto)
+        examples = changed_examples(self.snapshot, snapshot)
+        with self._lock:
+            self.snapshot = snapshot
+            count = self._train(examples)
+            if not count:
+                self._refresh_allowed()
+        print(f"Logical-form model updated with {count} example(s).")
+        return count
+
+    def slot_log_probabilities(self, X):
+        scores = super().slot_log_probabilities(X)
+        for slot, clf in self.classifiers.items():
+            scores[slot][:, clf.classes_ == _UNSEEN] = -np.inf
+        return scores
+
+    def predict(self, X):
+        with self._lock:
+            return super().predict(X)
+
+    def predict_top_k(self, X, k=3):
+        with self._lock:
+            return super().predict_top_k(X, k)
+
+
+# For quick testing and direct module execution:
+if __name__ == "__main__":
+    from neuro_symbolic.ml_model import convert_to_logical
+    from neuro_symbolic.ontology_engine import load_ontology
+
+    ontology = load_ontology()
+    model = OnlineSlotModel()
+    model.fit_ontology(ontology)
+    print(convert_to_logical("Piston causes failure of Oil engine", model, model.vectorizer))
+    with ontology:
+        ontology.motor_1.CausesFailure.append(ontology.oil_engine_1)
+    model.update(ontology)
+    print(convert_to_logical("Motor causes failure of Oil engine", model, model.vectorizer))
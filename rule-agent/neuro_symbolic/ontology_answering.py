@@ -0,0 +1,116 @@
+"""
+ontology_answering.py
+
+Purpose:
+---------
+- Answer factual questions directly from the ontology when the predicted logical form is
+  confident and can be evaluated, with a templated response instead of an LLM call.
+- Otherwise (ambiguous prediction, unknown entities), report the evaluation of the
+  candidate logical forms so the LLM prompt gets the actual result.
+
+The confidence of the best logical form is its probability relative to the runner-up's
+(p1 / (p1 + p2), see ml_model.convert_to_logical_batch()): 0.5 when two candidates are
+equally likely, 1.0 without a competitor. Its probability p1 must also reach a minimum: a
+question without any known word gets the model's prior, which can still rank one logical
+form ahead of the others.
+
+Configuration:
+    ANSWER_CONFIDENCE        Minimum confidence to answer from the ontology (default 0.6).
+    ANSWER_MIN_PROBABILITY   Minimum probability of the best logical form (default 0.15).
+    ANSWER_TOP_K             Candidate logical forms considered per question (default 3).
+"""
+
+import os
+from collections import namedtuple
+
+from neuro_symbolic.entity_index import get_entity_index
+from neuro_symbolic.evaluation import check_statement_with_details, parse_statement
+from neuro_symbolic.ml_model import verbalize_property
+
+ANSWER_CONFIDENCE = float(os.getenv("ANSWER_CONFIDENCE", "0.6"))
+ANSWER_MIN_PROBABILITY = float(os.getenv("ANSWER_MIN_PROBABILITY", "0.15"))
+ANSWER_TOP_K = int(os.getenv("ANSWER_TOP_K", "3"))
+
+# answer is the templated response, or None if the question needs the LLM.
+OntologyAnswer = namedtuple("OntologyAnswer", ["logical_form", "confidence", "holds", "detail", "answer", "evaluations"])
+
+
+def _verb_phrase(phrase, negated):
+    """ "causes failure of" -> "does not cause failure of" when negated."""
+    if not negated:
+        return phrase
+    verb, _, rest = phrase.partition(" ")
+    if verb.endswith("s") and not verb.endswith("ss"):
+        verb = verb[:-1]
+    return f"does not {verb} {rest}".strip()
+
+
+def render_answer(onto, logical_form, holds):
+    """
+    Templated answer to a yes/no question about a logical form.
+
+    Args:
+        onto: The loaded ontology.
+        logical_form (str): "[not ]subject.property(object)".
+        holds (bool): Whether the logical form holds in the ontology.
+    """
+    negated, subject, prop, obj = parse_statement(logical_form)
+    entity = get_entity_index(onto).get(prop)
+    phrase = verbalize_property(entity) if entity is not None else prop
+    # What the ontology says, whichever way the question was asked.
+    fact_negated = negated == holds
+    return (f"{'Yes' if holds else 'No'}. According to the ontology, "
+            f"{subject} {_verb_phrase(phrase, fact_negated)} {obj}.")
+
+
+def answer_from_ontology(onto, candidates, min_confidence=ANSWER_CONFIDENCE,
+                         min_probability=ANSWER_MIN_PROBABILITY):
+    """
+    Evaluate the candidate logical forms of a question and answer it if the best is confident.
+
+    Args:
+        onto: The loaded ontology.
+        candidates (List[tuple(str, float)]): (logical_form, probability), most probable first.
+        min_confidence (float): Minimum confidence of the best candidate, from 0.5 to 1.
+        min_probability (float): Minimum probability of the best candidate.
+
+    Returns:
+        OntologyAnswer: The best logical form, its confidence and evaluation, the templated
+                        answer (None when the LLM should answer) and the evaluation of every
+                        candidate as (logical_form, probability, holds, detail).
+    """
+    evaluations = [(lf, p) + tuple(check_statement_with_details(onto, lf)) for lf, p in candidates]
+    if not evaluations:
+        return OntologyAnswer(None, 0.0, False, "No logical form was predicted.", None, [])
+    logical_form, probability, holds, detail = evaluations[0]
+    runner_up = evaluations[1][1] if len(evaluations) > 1 else 0.0
+    confidence = probability / (probability + runner_up) if probability else 0.0
+
+    # A detail on a failed evaluation that is not "does not hold" means unknown entities.
+    evaluated = holds or (detail or "").startswith("Evaluation failed:")
+    answer = None
+    if confidence >= min_confidence and probability >= min_probability and evaluated:
+        answer = render_answer(onto, logical_form, holds)
+    return OntologyAnswer(logical_form, confidence, holds, detail, answer, evaluations)
+
+
+def describe_evaluations(result):
+    """Evaluation results for the LLM prompt: every candidate with its probability and outcome."""
+    lines = [f"Best logical form: {result.logical_form} (confidence {result.confidence:.2f})"]
+    for logical_form, probability, holds, detail in result.evaluations:
+        outcome = "TRUE" if holds else "FALSE"
+        lines.append(f" - {logical_form} (p={probability:.3f}): {outcome}" + (f" - {detail}" if detail else ""))
+    return "\n".join(lines)
+
+
+# For quick testing and direct module execution:
+if __name__ == "__main__":
+    from neuro_symbolic.ml_model import convert_to_logical_batch, modelizer
+    from neuro_symbolic.ontology_engine import load_ontology
+
+    ontology = load_ontology()
+    model, vectorizer = modelizer(ontology)
+    questions = ["Does the piston cause failure of the oil engine?", "What about the weather?"]
+    for question, candidates in zip(questions, convert_to_logical_batch(questions, model, vectorizer, ANSWER_TOP_K)):
+        result = answer_from_ontology(ontology, candidates)
+        print(question, "->", result.answer or "(LLM)\n" + describe_evaluations(result))
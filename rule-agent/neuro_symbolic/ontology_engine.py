@@ -6,23 +6,134 @@ Purpose:
 - Define the OWL ontology (engine domain) and all related classes/properties.
 - Initialize the reasoner (via owlready2) and provide functions such as get_ontology_info().
 - Encapsulate ontology updates and reasoner synchronization.
+- Cache the materialized (reasoned) ontology on disk, keyed by a hash of the asserted
+  axioms, so a warm start loads the inferred result instead of running the reasoner.
+- Run the reasoner out of process (see reasoner_worker) and publish its result through
+  OntologyHolder as an atomic swap, so readers keep the previous state meanwhile.
 """
 
-from owlready2 import get_ontology, Thing, ObjectProperty, sync_reasoner
+import hashlib
+import io
+import os
+import shutil
+import threading
+
+import owlready2
+from owlready2 import World, default_world, Thing, ObjectProperty
+
+from neuro_symbolic.entity_index import get_entity_index
+from neuro_symbolic.reachability import get_reachability_index, has_reachability_index
+from neuro_symbolic.reasoner_worker import load_outputs, run_reasoner
+from neuro_symbolic.sparql_queries import forget_world
 
 # Define a constant for the ontology IRI (adjust as needed)
 ONTOLOGY_IRI = "http://example.org/engine_ontology.owl"
 ONTOLOGY_FILE = "engine_ontology.owl"
+# Directory of the materialized ontologies (<axiom hash>.owl)
+ONTOLOGY_CACHE_DIR = os.getenv("ONTOLOGY_CACHE_DIR", ".ontology_cache")
+
+
+def axiom_hash(onto):
+    """
+    Hash the asserted content of an ontology.
+
+    The ontology is serialized as N-Triples and the sorted lines are hashed, so the key does
+    not depend on the order in which axioms were added. The owlready2 version (which bundles
+    the reasoner) is part of the key.
+
+    Args:
+        onto (Ontology): The ontology to hash.
+
+    Returns:
+        str: A hex SHA-256 digest.
+    """
+    buffer = io.BytesIO()
+    onto.save(file=buffer, format="ntriples")
+    digest = hashlib.sha256(str(owlready2.VERSION).encode("utf-8"))
+    for line in sorted(buffer.getvalue().splitlines()):
+        digest.update(line + b"\n")
+    return digest.hexdigest()
+
+
+def world_hash(onto):
+    """
+    Hash the asserted content of every ontology loaded alongside onto.
+
+    Covers imported ontologies and the other files of an ontology store (all share onto's
+    world), each hashed with axiom_hash() and combined in IRI order.
+
+    Args:
+        onto (Ontology): An ontology of the world to hash.
+
+    Returns:
+        str: A hex SHA-256 digest.
+    """
+    digest = hashlib.sha256()
+    for iri, ontology in sorted(onto.world.ontologies.items()):
+        digest.update(f"{iri} {axiom_hash(ontology)}\n".encode("utf-8"))
+    return digest.hexdigest()
+
 
+def _cache_path(key):
+    return os.path.join(ONTOLOGY_CACHE_DIR, key + ".owl")
 
-def create_ontology():
+
+def create_ontology(use_cache=True):
     """
     Create and initialize the engine ontology with its classes, properties, and instances.
-    
+
+    The asserted ontology is first built in a scratch world and hashed. If a materialized
+    ontology for that hash is cached, it is loaded and the reasoner is skipped; otherwise
+    the reasoner runs (in a worker process) and its result is added to the cache.
+
+    Args:
+        use_cache (bool): Whether to load a cached materialized ontology if there is one.
+
     Returns:
         onto (Ontology): The initialized ontology.
     """
-    onto = get_ontology(ONTOLOGY_IRI)
+    asserted = define_ontology(World())
+    key = axiom_hash(asserted)
+    cached = _cache_path(key)
+    if use_cache and os.path.exists(cached):
+        print("Loaded materialized ontology from cache:", cached)
+    else:
+        # Run the reasoner to infer new knowledge within the ontology
+        run_reasoner(asserted, cached)
+        # Save the ontology to a file
+        shutil.copyfile(cached, ONTOLOGY_FILE)
+
+    return load_materialized(cached, default_world)
+
+
+def load_materialized(path, world=None):
+    """
+    Load a materialized ontology file, and the other reasoned ontologies of its world, into a world.
+
+    Args:
+        path (str): The reasoned ontology (RDF/XML, see reasoner_worker.load_outputs).
+        world (World): Target world (default: a new, independent world).
+
+    Returns:
+        onto (Ontology): The loaded ontology, with its entity index already built.
+    """
+    world = World() if world is None else world
+    onto = load_outputs(path, world, ONTOLOGY_IRI)
+    get_entity_index(onto)
+    return onto
+
+
+def define_ontology(world):
+    """
+    Define the engine domain (classes, properties and instances) in the given world.
+
+    Args:
+        world (World): The owlready2 world to create the ontology in.
+
+    Returns:
+        onto (Ontology): The asserted (not yet reasoned) ontology.
+    """
+    onto = world.get_ontology(ONTOLOGY_IRI)
     with onto:
         # Define classes
         class Engine(Thing):
@@ -90,26 +201,141 @@ def create_ontology():
         battery.CausesFailure.append(electric_engine)
         motor.CausesFailure.append(electric_engine)
 
-    # Save the ontology to a file
-    onto.save(file=ONTOLOGY_FILE)
+    return onto
 
-    # Run the reasoner to infer new knowledge within the ontology
-    update_ontology(onto)
 
-    return onto
+def load_ontology():
+    """
+    Return the ontology configured for this deployment.
 
+    OWL files listed in ONTOLOGY_FILES are served from the persistent quadstore (see
+    ontology_store); without them, the built-in engine ontology is created.
 
-def update_ontology(onto):
+    Returns:
+        onto (Ontology): The loaded ontology.
+    """
+    from neuro_symbolic.ontology_store import ONTOLOGY_FILES, open_ontology_store
+
+    if ONTOLOGY_FILES:
+        return open_ontology_store(ONTOLOGY_FILES)
+    return create_ontology()
+
+
+def update_ontology(onto, cache_key=None, timeout=None):
     """
     Update (synchronize) the ontology by running the reasoner.
     This will infer new knowledge and update relationships if applicable.
+
+    The reasoner runs in a worker process with a time and memory limit (see reasoner_worker)
+    on a copy of the ontology, which is left unchanged. The materialized result is stored in
+    the cache under a hash of the content the reasoner was run on (every ontology of the
+    world, see world_hash) and of where the inferences go, so the same content is never
+    reasoned over twice; the time and memory limits do not change the result and are not
+    part of the key. It is returned as a new ontology in its own world together with
+    the other ontologies of onto's world (e.g. the other files of an ontology store).
     
     Args:
         onto (Ontology): The ontology to be updated.
+        cache_key (str): Cache key of the reasoned result, if already computed.
+        timeout (float): Wall-clock limit of the reasoner in seconds (default: REASONER_TIMEOUT).
+
+    Returns:
+        onto (Ontology): The reasoned ontology.
     """
-    with onto:
-        sync_reasoner()  # Uses the default reasoner (e.g., HermiT)
-    onto.save(file=ONTOLOGY_FILE)
+    from neuro_symbolic.ontology_store import INFERENCES_IRI
+
+    # Worlds of an ontology store keep their inferences apart, rebuilt on every run.
+    inferences_iri = INFERENCES_IRI if INFERENCES_IRI in onto.world.ontologies else None
+    if cache_key is None:
+        options = f"inferences={inferences_iri or onto.base_iri}"
+        cache_key = hashlib.sha256(f"{world_hash(onto)}\n{options}".encode("utf-8")).hexdigest()
+    cached = _cache_path(cache_key)
+    if not os.path.exists(cached):
+        run_reasoner(onto, cached, timeout=timeout, inferences_iri=inferences_iri)  # Uses the default reasoner (e.g., HermiT)
+    return load_materialized(cached)
+
+
+class OntologyHolder:
+    """
+    The ontology currently served, replaced atomically after re-classification.
+
+    Readers take holder.current once per request and use that consistent state; reclassify()
+    reasons in the background (out of process) and swaps in the result when it is complete.
+    If the reasoner fails or times out, the previous ontology stays in place.
+    """
+
+    def __init__(self, onto):
+        self._current = onto
+        self._lock = threading.Lock()
+        self._worker = None
+        self._pending = None
+        self._rerun = False
+        self.version = 0
+        self.last_error = None
+        # Called with the new ontology after each swap (e.g. to update a model).
+        self.listeners = []
+
+    @property
+    def current(self):
+        return self._current
+
+    @property
+    def reclassifying(self):
+        """True while a re-classification runs in the background."""
+        worker = self._worker
+        return worker is not None and worker.is_alive()
+
+    def status(self):
+        return {"version": self.version, "reclassifying": self.reclassifying, "last_error": self.last_error}
+
+    def swap(self, onto):
+        if has_reachability_index(self._current):
+            # Updated from the current index before readers can see the new ontology.
+            get_reachability_index(onto)
+        with self._lock:
+            previous, self._current = self._current, onto
+            self.version += 1
+        if previous.world is not onto.world:
+            forget_world(previous.world)
+        for listener in list(self.listeners):
+            try:
+                listener(onto)
+            except Exception as e:  # noqa: BLE001
+                print("⚠️  Ontology update listener failed:", e)
+
+    def reclassify(self, onto=None, timeout=None):
+        """
+        Re-run the reasoner on onto (default: the current ontology) in the background.
+
+        Returns:
+            threading.Thread: The background worker; join() it to wait for the swap.
+        """
+        with self._lock:
+            self._pending = onto if onto is not None else self._current
+            if self._worker is not None and self._worker.is_alive():
+                # One run at a time: the latest request runs after the current one.
+                self._rerun = True
+                return self._worker
+            self._worker = threading.Thread(target=self._run, args=(timeout,),
+                                            name="ontology-reasoner", daemon=True)
+            self._worker.start()
+            return self._worker
+
+    def _run(self, timeout):
+        while True:
+            with self._lock:
+                onto, self._rerun = self._pending, False
+            try:
+                self.swap(update_ontology(onto, timeout=timeout))
+                self.last_error = None
+                print(f"Ontology re-classified (version {self.version}).")
+            except Exception as e:  # noqa: BLE001
+                self.last_error = str(e)
+                print("⚠️  Re-classification failed, keeping the previous ontology:", e)
+            with self._lock:
+                if not self._rerun:
+                    self._worker = None
+                    return
 
 
 def get_ontology_info(onto):
@@ -0,0 +1,160 @@
+"""
+ontology_store.py
+
+Purpose:
+---------
+- Load ontologies from OWL files (RDF/XML, OWL/XML or N-Triples) into a persistent
+  owlready2 quadstore (an SQLite database) instead of building them in Python.
+- Reopen the quadstore directly on later starts: files are only parsed (and reasoned
+  over) again when their content changes, and the graph stays on disk instead of in memory.
+
+Inferred triples are kept in their own ontology (INFERENCES_IRI), which is dropped and
+rebuilt whenever a file changes, so no inference outlives the axioms it was derived from.
+
+Configuration:
+    ONTOLOGY_FILES       OWL files to load, separated by os.pathsep (":" on Linux).
+                         The first file is the main ontology.
+    ONTOLOGY_STORE       Path of the SQLite quadstore (default .ontology_cache/quadstore.sqlite3).
+    ONTOLOGY_REASONING   "1" (default) to run the reasoner after (re)loading files, "0" to skip it.
+"""
+
+import hashlib
+import json
+import os
+
+from owlready2 import World
+
+from neuro_symbolic.entity_index import invalidate_entity_index
+from neuro_symbolic.reachability import invalidate_reachability_index
+from neuro_symbolic.reasoner_worker import run_reasoner
+
+ONTOLOGY_FILES = [f for f in os.getenv("ONTOLOGY_FILES", "").split(os.pathsep) if f.strip()]
+ONTOLOGY_STORE = os.getenv("ONTOLOGY_STORE", os.path.join(".ontology_cache", "quadstore.sqlite3"))
+ONTOLOGY_REASONING = os.getenv("ONTOLOGY_REASONING", "1") == "1"
+# Ontology of the reasoner's results, separate from the ontologies loaded from files.
+INFERENCES_IRI = "http://example.org/inferences.owl#"
+
+
+def file_hash(path):
+    """SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_state(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_state(path, state):
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def store_hash(onto):
+    """
+    Hash of the content of the quadstore onto belongs to, from the file hashes recorded in
+    <store>.json when the files were loaded, so nothing is serialized.
+
+    Args:
+        onto (Ontology): An ontology of the quadstore's world.
+
+    Returns:
+        str: A hex SHA-256 digest, or None if onto's world is not an ontology store.
+    """
+    state_path = onto.world.filename + ".json"
+    if not os.path.exists(state_path):
+        return None
+    digest = hashlib.sha256(f"{onto.base_iri}\n".encode("utf-8"))
+    for entry in sorted(_read_state(state_path).values(), key=lambda e: e["iri"]):
+        digest.update(f"{entry['iri']} {entry['hash']}\n".encode("utf-8"))
+    digest.update(f"reasoned={INFERENCES_IRI in onto.world.ontologies}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def open_ontology_store(files=None, store_path=None, reasoning=None):
+    """
+    Open the persistent quadstore and make sure it holds the current content of the OWL files.
+
+    The store records the content hash and ontology IRI of every loaded file (in
+    <store>.json). Unchanged files are used straight from the store; changed or new files
+    replace their previous version, after which the inferences of the previous content are
+    dropped, the store is saved and the reasoner runs once in a worker process (see
+    reasoner_worker), writing its results to the INFERENCES_IRI ontology.
+
+    Args:
+        files (List[str]): OWL files to load (default: ONTOLOGY_FILES).
+        store_path (str): SQLite quadstore path (default: ONTOLOGY_STORE).
+        reasoning (bool): Run the reasoner after loading changed files (default: ONTOLOGY_REASONING).
+
+    Returns:
+        onto (Ontology): The ontology of the first file.
+    """
+    files = [os.path.abspath(f) for f in (files if files is not None else ONTOLOGY_FILES)]
+    if not files:
+        raise ValueError("No ontology files configured (set ONTOLOGY_FILES).")
+    store_path = store_path or ONTOLOGY_STORE
+    reasoning = ONTOLOGY_REASONING if reasoning is None else reasoning
+    os.makedirs(os.path.dirname(os.path.abspath(store_path)), exist_ok=True)
+
+    state_path = store_path + ".json"
+    state = _read_state(state_path)
+    world = World(filename=store_path, exclusive=False)
+
+    ontologies, changed = [], False
+    for path in files:
+        fp = file_hash(path)
+        entry = state.get(path)
+        onto = world.ontologies.get(entry["iri"]) if entry else None
+        if onto is not None and entry["hash"] == fp:
+            # Already in the quadstore: nothing is parsed.
+            onto.load()
+        else:
+            if onto is not None:
+                onto.destroy()
+            onto = world.get_ontology("file://" + path).load()
+            state[path] = {"hash": fp, "iri": onto.base_iri}
+            changed = True
+            print("Loaded ontology file into the quadstore:", path)
+        ontologies.append(onto)
+
+    for path in [p for p in state if p not in files]:
+        # A file that is no longer configured: drop its triples.
+        onto = world.ontologies.get(state.pop(path)["iri"])
+        if onto is not None:
+            onto.destroy()
+        changed = True
+
+    if changed:
+        # Inferred from the previous content of the files (any of them): re-derived below.
+        inferences = world.ontologies.get(INFERENCES_IRI)
+        if inferences is not None:
+            inferences.destroy()
+        invalidate_entity_index(world)
+        invalidate_reachability_index(ontologies[0])
+        world.save()
+        if reasoning:
+            # The worker reasons over a snapshot and writes the reasoned quadstore, which
+            # then replaces the store file (if the reasoner fails, nothing is replaced).
+            iris = [onto.base_iri for onto in ontologies]
+            reasoned = store_path + ".reasoned"
+            run_reasoner(ontologies[0], reasoned, inferences_iri=INFERENCES_IRI)
+            world.close()
+            os.replace(reasoned, store_path)
+            world = World(filename=store_path, exclusive=False)
+            ontologies = [world.get_ontology(iri).load() for iri in iris]
+        _write_state(state_path, state)
+    return ontologies[0]
+
+
+# For quick testing and direct module execution:
+if __name__ == "__main__":
+    from neuro_symbolic.ontology_engine import get_ontology_info
+    ontology = open_ontology_store()
+    print(get_ontology_info(ontology))
@@ -9,7 +9,7 @@ Purpose:
 
 import re
 import json
-from langchain.prompts import PromptTemplate
+from langchain_core.prompts import PromptTemplate
 
 # ------------------------------------------------------------------------------
 # Stub for WatsonxLLM invocation. In production, replace or import the appropriate function.
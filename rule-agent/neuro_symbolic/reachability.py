@@ -0,0 +1,214 @@
+"""
+reachability.py
+
+Purpose:
+---------
+- Precompute the transitive closure of object properties over individuals, so multi-hop
+  questions ("which components can ultimately cause failure of oil_engine_1?") are answered
+  with a bit lookup instead of repeated prop[subject] traversals.
+- Keep the index current across ontology updates: the index of an updated ontology is
+  derived from the previous one, applying added relations incrementally.
+
+For each property, the closure is a bit matrix over the individuals that take part in the
+property (one packed row of bits per individual: bit j of row i is set if j is reachable
+from i in one or more steps). Queries take microseconds: reachable() tests one bit,
+causes_of() reads one column and effects_of() one row.
+
+Configuration:
+    REACHABILITY_PROPERTIES   Comma-separated property names to index (default: all object properties).
+"""
+
+import os
+import threading
+import weakref
+
+import numpy as np
+
+REACHABILITY_PROPERTIES = [p.strip() for p in os.getenv("REACHABILITY_PROPERTIES", "").split(",") if p.strip()]
+
+# Rebuild instead of updating when more relations than this fraction are added at once.
+_MAX_INCREMENTAL_FRACTION = 0.25
+
+_EDGES_SQL = (
+    "SELECT rs.iri, ro.iri FROM objs "
+    "JOIN resources rs ON rs.storid = objs.s JOIN resources ro ON ro.storid = objs.o "
+    "WHERE objs.p = ?"
+)
+
+
+def _local_name(entity):
+    if isinstance(entity, str):
+        return entity
+    return entity.name
+
+
+class Closure:
+    """Transitive closure of one relation, as packed bit rows."""
+
+    def __init__(self, edges):
+        self.edges = set(edges)
+        self.nodes = []
+        self.position = {}
+        self.bits = np.zeros((0, 0), dtype=np.uint8)
+        self._grow({n for edge in self.edges for n in edge})
+        for u, v in self.edges:
+            self.bits[self.position[u], self.position[v] >> 3] |= 0x80 >> (self.position[v] & 7)
+        # Warshall: every node that reaches k also reaches what k reaches.
+        for k in range(len(self.nodes)):
+            column = (self.bits[:, k >> 3] & (0x80 >> (k & 7))) != 0
+            if column.any():
+                self.bits[column] |= self.bits[k]
+
+    def copy(self):
+        closure = Closure.__new__(Closure)
+        closure.edges = set(self.edges)
+        closure.nodes = list(self.nodes)
+        closure.position = dict(self.position)
+        closure.bits = self.bits.copy()
+        return closure
+
+    def _grow(self, nodes):
+        new = sorted(n for n in nodes if n not in self.position)
+        if not new:
+            return
+        for node in new:
+            self.position[node] = len(self.nodes)
+            self.nodes.append(node)
+        size = len(self.nodes)
+        bits = np.zeros((size, (size + 7) // 8), dtype=np.uint8)
+        bits[:self.bits.shape[0], :self.bits.shape[1]] = self.bits
+        self.bits = bits
+
+    def add_edge(self, u, v):
+        """Add the relation u -> v: u and everything reaching u now reach v and its successors."""
+        if (u, v) in self.edges:
+            return
+        self.edges.add((u, v))
+        self._grow((u, v))
+        i, j = self.position[u], self.position[v]
+        rows = (self.bits[:, i >> 3] & (0x80 >> (i & 7))) != 0
+        rows[i] = True
+        successors = self.bits[j].copy()
+        successors[j >> 3] |= 0x80 >> (j & 7)
+        self.bits[rows] |= successors
+
+    def contains(self, u, v):
+        i, j = self.position.get(u), self.position.get(v)
+        if i is None or j is None:
+            return False
+        return bool(self.bits[i, j >> 3] & (0x80 >> (j & 7)))
+
+    def row(self, u):
+        i = self.position.get(u)
+        if i is None:
+            return []
+        return [self.nodes[j] for j in np.flatnonzero(np.unpackbits(self.bits[i])[:len(self.nodes)])]
+
+    def column(self, v):
+        j = self.position.get(v)
+        if j is None:
+            return []
+        return [self.nodes[i] for i in np.flatnonzero(self.bits[:, j >> 3] & (0x80 >> (j & 7)))]
+
+
+class ReachabilityIndex:
+    """Per-property transitive closures of an ontology, with names as keys."""
+
+    def __init__(self, onto, properties=None, previous=None):
+        """
+        Args:
+            onto: The loaded ontology (owlready2 ontology instance).
+            properties (List[str]): Property names to index (default: REACHABILITY_PROPERTIES,
+                                    or all object properties).
+            previous (ReachabilityIndex): Index of an earlier version of the ontology; closures
+                                          whose relations were only added to are updated from it.
+        """
+        world = onto.world
+        names = properties or REACHABILITY_PROPERTIES
+        props = [p for p in world.object_properties() if not names or p.name in names]
+        self.closures = {}
+        self.updated = []
+        for prop in props:
+            edges = {(s.rsplit("#", 1)[-1], o.rsplit("#", 1)[-1])
+                     for s, o in world.graph.db.execute(_EDGES_SQL, (prop.storid,))}
+            old = previous.closures.get(prop.name) if previous is not None else None
+            if old is not None and old.edges <= edges and \
+                    len(edges - old.edges) <= _MAX_INCREMENTAL_FRACTION * max(len(old.edges), 1):
+                closure = old.copy()
+                for u, v in edges - old.edges:
+                    closure.add_edge(u, v)
+                self.updated.append(prop.name)
+            else:
+                closure = Closure(edges)
+            self.closures[prop.name] = closure
+
+    def reachable(self, subject, prop, obj):
+        """True if obj can be reached from subject over one or more prop relations."""
+        closure = self.closures.get(_local_name(prop))
+        return closure is not None and closure.contains(_local_name(subject), _local_name(obj))
+
+    def effects_of(self, subject, prop):
+        """Names of all individuals reachable from subject (e.g. everything it can cause to fail)."""
+        closure = self.closures.get(_local_name(prop))
+        return closure.row(_local_name(subject)) if closure is not None else []
+
+    def causes_of(self, obj, prop):
+        """Names of all individuals from which obj is reachable (e.g. all causes of its failure)."""
+        closure = self.closures.get(_local_name(prop))
+        return closure.column(_local_name(obj)) if closure is not None else []
+
+
+_indexes = weakref.WeakKeyDictionary()
+_latest = None
+_lock = threading.Lock()
+
+
+def get_reachability_index(onto):
+    """
+    Return the reachability index of the ontology's world, building it on first use.
+
+    A new world (e.g. a re-classified ontology) gets an index derived from the latest one.
+
+    Args:
+        onto: An owlready2 ontology.
+    """
+    global _latest
+    world = onto.world
+    index = _indexes.get(world)
+    if index is None:
+        with _lock:
+            index = _indexes.get(world)
+            if index is None:
+                index = _indexes[world] = ReachabilityIndex(onto, previous=_latest)
+                _latest = index
+    return index
+
+
+def has_reachability_index(onto):
+    """True if the index of the ontology's world has been built."""
+    return onto.world in _indexes
+
+
+def invalidate_reachability_index(onto):
+    """
+    Drop the index of the ontology's world; the next get_reachability_index() updates it
+    from the dropped one. Call it after the ontology is updated in place.
+
+    Args:
+        onto: An owlready2 ontology.
+    """
+    global _latest
+    with _lock:
+        index = _indexes.pop(onto.world, None)
+        if index is not None:
+            _latest = index
+
+
+# For quick testing and direct module execution:
+if __name__ == "__main__":
+    from neuro_symbolic.ontology_engine import load_ontology
+
+    ontology = load_ontology()
+    reach = get_reachability_index(ontology)
+    print("Causes of oil_engine_1 failure:", reach.causes_of("oil_engine_1", "CausesFailure"))
+    print("piston_1 -> oil_engine_1:", reach.reachable("piston_1", "CausesFailure", "oil_engine_1"))
@@ -0,0 +1,155 @@
+"""
+reasoner_worker.py
+
+Purpose:
+---------
+- Run the OWL reasoner (HermiT via owlready2's sync_reasoner) in a separate, managed process
+  instead of inline in the thread that needs the result.
+- Bound the run with a wall-clock timeout (the worker and its Java child are killed) and a
+  memory limit (the reasoner's Java heap), and hand the inferred ontology back as a file.
+
+The caller's ontology is copied to an SQLite snapshot that the worker opens, reasons over and
+writes out: as RDF/XML for an ".owl" output (the ontology itself, with the other ontologies of
+its world in "<output>.d", see load_outputs), or as the whole reasoned quadstore otherwise.
+The output file is replaced atomically, and last, so it is either complete or absent.
+
+Configuration:
+    REASONER_TIMEOUT     Wall-clock limit in seconds (default 300).
+    REASONER_MEMORY_MB   Maximum Java heap of the reasoner in MB (default 2048).
+"""
+
+import json
+import os
+import signal
+import subprocess
+import sys
+from itertools import islice
+
+from neuro_symbolic.batch_evaluation import create_snapshot
+
+REASONER_TIMEOUT = float(os.getenv("REASONER_TIMEOUT", "300"))
+REASONER_MEMORY_MB = int(os.getenv("REASONER_MEMORY_MB", "2048"))
+
+# Directory containing the neuro_symbolic package (the worker's working directory).
+_PACKAGE_PARENT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ReasonerError(RuntimeError):
+    """The reasoner worker failed (inconsistent ontology, Java error, ...)."""
+
+
+class ReasonerTimeout(ReasonerError):
+    """The reasoner worker exceeded its wall-clock limit and was killed."""
+
+
+def run_reasoner(onto, output_path, timeout=None, memory_mb=None, inferences_iri=None):
+    """
+    Reason over a copy of the ontology in a worker process and write the result to output_path.
+
+    The calling thread only waits; the ontology itself is not modified.
+
+    Args:
+        onto: The ontology to reason over (its whole world is copied).
+        output_path (str): ".owl" for the reasoned ontologies as RDF/XML, anything else
+                           (e.g. ".sqlite3") for the reasoned quadstore.
+        timeout (float): Wall-clock limit in seconds (default: REASONER_TIMEOUT).
+        memory_mb (int): Java heap limit in MB (default: REASONER_MEMORY_MB).
+        inferences_iri (str): Ontology the inferred triples are written to (default: onto itself).
+                              If it is another ontology, its previous content is replaced.
+
+    Raises:
+        ReasonerTimeout: The worker was killed after the timeout.
+        ReasonerError: The worker failed.
+    """
+    timeout = REASONER_TIMEOUT if timeout is None else timeout
+    memory_mb = REASONER_MEMORY_MB if memory_mb is None else memory_mb
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    snapshot = create_snapshot(onto)
+    command = [sys.executable, "-m", "neuro_symbolic.reasoner_worker",
+               snapshot, onto.base_iri, output_path, str(memory_mb), inferences_iri or onto.base_iri]
+    try:
+        # A new session, so that the Java child can be killed together with the worker.
+        proc = subprocess.Popen(command, cwd=_PACKAGE_PARENT, start_new_session=True,
+                                stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        try:
+            output, _ = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            os.killpg(proc.pid, signal.SIGKILL)
+            proc.communicate()
+            raise ReasonerTimeout(f"Reasoner exceeded {timeout:g}s and was stopped.")
+        if proc.returncode != 0:
+            message = output.decode("utf-8", "replace").strip().splitlines()[-20:]
+            raise ReasonerError("Reasoner failed:\n" + "\n".join(message))
+    finally:
+        if os.path.exists(snapshot):
+            os.remove(snapshot)
+
+
+def load_outputs(path, world, default_iri):
+    """
+    Load the ontologies written by the worker for an ".owl" output into a world.
+
+    Args:
+        path (str): The ".owl" output.
+        world (World): Target world.
+        default_iri (str): IRI of the ontology for outputs without "<output>.d" (older caches).
+
+    Returns:
+        onto (Ontology): The reasoned ontology (the one the reasoner was run on).
+    """
+    manifest = os.path.join(path + ".d", "ontologies.json")
+    listed = {"iri": default_iri, "ontologies": []}
+    if os.path.exists(manifest):
+        with open(manifest, encoding="utf-8") as f:
+            listed = json.load(f)
+    with open(path, "rb") as f:
+        onto = world.get_ontology(listed["iri"]).load(fileobj=f)
+    for entry in listed["ontologies"]:
+        with open(os.path.join(path + ".d", entry["file"]), "rb") as f:
+            world.get_ontology(entry["iri"]).load(fileobj=f)
+    return onto
+
+
+def _save_outputs(world, onto, output_path):
+    """Write onto to output_path and the other ontologies of its world to <output>.d."""
+    directory = output_path + ".d"
+    os.makedirs(directory, exist_ok=True)
+    listed = []
+    for number, (iri, ontology) in enumerate(sorted(world.ontologies.items())):
+        # Skipped when it holds nothing but its own declaration (e.g. "http://anonymous/").
+        if ontology is not onto and len(list(islice(ontology.get_triples(), 2))) > 1:
+            name = f"{number}.owl"
+            ontology.save(file=os.path.join(directory, name))
+            listed.append({"iri": iri, "file": name})
+    with open(os.path.join(directory, "ontologies.json"), "w", encoding="utf-8") as f:
+        json.dump({"iri": onto.base_iri, "ontologies": listed}, f, indent=2)
+    onto.save(file=output_path + ".tmp")
+    os.replace(output_path + ".tmp", output_path)
+
+
+def _main(snapshot, base_iri, output_path, memory_mb, inferences_iri):
+    """Worker entry point: reason over the snapshot and write the result."""
+    import owlready2.reasoning
+    from owlready2 import World, sync_reasoner
+
+    owlready2.reasoning.JAVA_MEMORY = int(memory_mb)
+    world = World(filename=snapshot, exclusive=False)
+    onto = world.get_ontology(base_iri).load()
+    previous = world.ontologies.get(inferences_iri)
+    if previous is not None and previous is not onto:
+        # Inferred from earlier content: derived again below.
+        previous.destroy()
+    with world.get_ontology(inferences_iri):
+        sync_reasoner(world)
+    if output_path.endswith(".owl"):
+        _save_outputs(world, onto, output_path)
+    else:
+        world.save()
+        world.close()
+        os.replace(snapshot, output_path)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 6:
+        sys.exit("usage: python -m neuro_symbolic.reasoner_worker SNAPSHOT ONTOLOGY_IRI OUTPUT MEMORY_MB INFERENCES_IRI")
+    _main(*sys.argv[1:])
@@ -0,0 +1,165 @@
+"""
+sparql_queries.py
+
+Purpose:
+---------
+- Run read-only SPARQL queries over the loaded ontology with owlready2's native SPARQL
+  engine (queries are translated to SQL over the quadstore, without rdflib).
+- Keep prepared (translated) queries in an LRU cache, so a repeated query is not parsed
+  again, and stream result rows from the SQLite cursor instead of building a result list.
+  The queries of a world are dropped when the ontology holder swaps it out (see forget_world).
+
+Parameters are written ??1, ??2, ... in the query and bound when it is executed, so one
+prepared query serves every parameter value.
+
+Configuration:
+    SPARQL_CACHE_SIZE   Prepared queries kept in the cache (default 256).
+    SPARQL_MAX_ROWS     Row limit of the HTTP route (default 10000).
+"""
+
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from itertools import islice
+
+from owlready2.sparql.main import PreparedSelectQuery
+
+from neuro_symbolic.entity_index import get_entity_index
+
+SPARQL_CACHE_SIZE = int(os.getenv("SPARQL_CACHE_SIZE", "256"))
+SPARQL_MAX_ROWS = int(os.getenv("SPARQL_MAX_ROWS", "10000"))
+
+
+class QueryCache:
+    """LRU cache of prepared SPARQL queries, keyed by world, query text and strictness."""
+
+    def __init__(self, size=SPARQL_CACHE_SIZE):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._queries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def prepare(self, world, query, strict=True):
+        """
+        Return the prepared query, translating it on a cache miss.
+
+        Args:
+            world: The owlready2 world the query runs on.
+            query (str): SPARQL text.
+            strict (bool): Reject IRIs that name no entity of the ontology.
+
+        Raises:
+            ValueError: The query is not a SELECT query (the ontology is read-only here).
+        """
+        # A weak reference never matches another world, even one at the same address.
+        key = (weakref.ref(world), query, strict)
+        with self._lock:
+            prepared = self._queries.get(key)
+            if prepared is not None:
+                self._queries.move_to_end(key)
+                self.hits += 1
+                return prepared
+        prepared = world.prepare_sparql(query, strict)
+        if not isinstance(prepared, PreparedSelectQuery):
+            raise ValueError("Only SELECT queries are allowed.")
+        with self._lock:
+            self.misses += 1
+            self._queries[key] = prepared
+            while len(self._queries) > self.size:
+                self._queries.popitem(last=False)
+        return prepared
+
+    def forget(self, world):
+        """Drop the prepared queries of a world (they keep it alive)."""
+        with self._lock:
+            for key in [k for k in self._queries if k[0]() in (world, None)]:
+                del self._queries[key]
+
+    def clear(self):
+        with self._lock:
+            self._queries.clear()
+
+    def stats(self):
+        return {"size": len(self._queries), "hits": self.hits, "misses": self.misses}
+
+
+_cache = QueryCache()
+
+
+def bind_parameters(onto, params):
+    """
+    Resolve query parameters: strings that are the local name of an entity
+    (e.g. "piston_1" or "Piston") are bound to that entity, other values stay literals.
+
+    Args:
+        onto: The loaded ontology.
+        params (List): Parameter values for ??1, ??2, ...
+    """
+    index = get_entity_index(onto)
+    return [index.get(p) if isinstance(p, str) and p in index else p for p in params]
+
+
+def sparql_query(onto, query, params=(), limit=None, strict=True):
+    """
+    Run a read-only SPARQL query and return an iterator over its rows.
+
+    The query is prepared, checked and executed before this returns (errors are raised
+    here); rows are then read from the SQLite cursor as the iterator advances.
+
+    Args:
+        onto: The loaded ontology (owlready2 ontology instance).
+        query (str): A SPARQL SELECT query; ??1, ??2, ... are parameters.
+        params (Sequence): Parameter values (entities or literals).
+        limit (int): Stop after this many rows (default: no limit).
+        strict (bool): Reject IRIs that name no entity of the ontology.
+
+    Returns:
+        Iterator[List]: One row per result, with entities as owlready2 objects.
+
+    Raises:
+        ValueError: Not a SELECT query, or the wrong number of parameters.
+    """
+    prepared = _cache.prepare(onto.world, query, strict)
+    if len(params) != prepared.nb_parameter:
+        raise ValueError(f"The query takes {prepared.nb_parameter} parameter(s), got {len(params)}.")
+    params = tuple(params)
+    # execute() is lazy: run the SQL now, decode the rows while iterating.
+    rows = prepared.execute(params, prepared.execute_raw(params))
+    return rows if limit is None else islice(rows, limit)
+
+
+def query_columns(onto, query, strict=True):
+    """Column names of a query (e.g. ["?s", "?o"]), from the prepared-query cache."""
+    return [c.lstrip("?") for c in _cache.prepare(onto.world, query, strict).column_names]
+
+
+def to_json_value(value):
+    """JSON form of a result value: entities by local name, literals as they are."""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    name = getattr(value, "name", None)
+    return name if name is not None else str(value)
+
+
+def query_cache_stats():
+    return _cache.stats()
+
+
+def forget_world(world):
+    """Drop the prepared queries of a world that is no longer served."""
+    _cache.forget(world)
+
+
+# For quick testing and direct module execution:
+if __name__ == "__main__":
+    from neuro_symbolic.ontology_engine import ONTOLOGY_IRI, load_ontology
+
+    ontology = load_ontology()
+    text = f"SELECT ?s ?o WHERE {{ ?s <{ONTOLOGY_IRI}#CausesFailure> ?o }}"
+    for row in sparql_query(ontology, text):
+        print([to_json_value(v) for v in row])
+    text = "SELECT ?x WHERE { ?x a ??1 }"
+    print([to_json_value(r[0]) for r in sparql_query(ontology, text, bind_parameters(ontology, ["Piston"]))])
+    print(query_cache_stats())
@@ -14,7 +14,14 @@
 #    limitations under the License.
 #
 
-from langchain.agents.structured_chat.prompt import FORMAT_INSTRUCTIONS as BASE_FORMAT_INSTRUCTIONS
+
+def __getattr__(name):
+    # BASE_FORMAT_INSTRUCTIONS comes from langchain.agents, which is slow to import;
+    # resolve it only when a caller actually asks for it.
+    if name == "BASE_FORMAT_INSTRUCTIONS":
+        from langchain.agents.structured_chat.prompt import FORMAT_INSTRUCTIONS
+        return FORMAT_INSTRUCTIONS
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # --------------------------
 # Original Prompt Templates
@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _fake_reasoner(onto, output_path, timeout=None, memory_mb=None, inferences_iri=None):
+    """Stands in for the Java reasoner: writes the asserted ontologies unchanged."""
+    from neuro_symbolic.reasoner_worker import _save_outputs
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    _save_outputs(onto.world, onto, output_path)
+
+
+@pytest.fixture
+def fake_reasoner(tmp_path, monkeypatch):
+    """Run in tmp_path, with the ontology cache there and without the Java reasoner."""
+    from neuro_symbolic import ontology_engine
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("ONTOLOGY_CACHE_DIR", str(tmp_path / "ontology_cache"))
+    monkeypatch.setattr(ontology_engine, "ONTOLOGY_CACHE_DIR", str(tmp_path / "ontology_cache"))
+    monkeypatch.setattr(ontology_engine, "run_reasoner", _fake_reasoner)
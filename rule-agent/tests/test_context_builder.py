@@ -0,0 +1,31 @@
+"""
+Ontology context of a prompt: the neighbourhood of each entity is bounded, however many
+instances or relations it has.
+"""
+
+from owlready2 import World
+
+from neuro_symbolic.context_builder import MAX_NEIGHBOURS, _Context, _expand
+from neuro_symbolic.ontology_engine import define_ontology
+
+
+def _expanded(onto, entity):
+    ctx = _Context(max_tokens=10000)
+    _expand(ctx, onto, entity)
+    return ctx.sections
+
+
+def test_neighbourhood_is_bounded():
+    onto = define_ontology(World())
+    with onto:
+        for number in range(2, 50):
+            onto.Piston(f"piston_{number}").CausesFailure.append(onto.oil_engine_1)
+
+    sections = _expanded(onto, onto.Piston)
+    assert len(sections["Individuals"]) == MAX_NEIGHBOURS
+    assert list(sections["Object Properties"].values()) == [
+        " - CausesFailure (domain: EngineComponent, range: Engine)"]
+
+    sections = _expanded(onto, onto.oil_engine_1)
+    assert len(sections["Relations"]) == MAX_NEIGHBOURS
+    assert " - piston_1.CausesFailure(oil_engine_1)" in sections["Relations"].values()
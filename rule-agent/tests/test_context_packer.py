@@ -0,0 +1,62 @@
+"""
+RAG context packing: consecutive chunks are merged back without the text the splitter
+repeated between them, and passages are added by relevance within the token budget.
+"""
+
+import pytest
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from ContextPacker import CHARS_PER_TOKEN, ContextPacker, estimate_tokens
+
+TEXT = ("The oil pump feeds the bearings. A worn pump lowers the pressure and the engine stops. "
+        "Replace the pump filter every 500 hours. Check the piston rings when the oil is black.")
+
+
+def _chunks(text, chunk_size, chunk_overlap, source="manual.pdf"):
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    return [Document(page_content=piece, metadata={"source": source, "file": source, "page": 0, "chunk": i})
+            for i, piece in enumerate(splitter.split_text(text))]
+
+
+@pytest.mark.parametrize("chunk_size, chunk_overlap", [(60, 30), (40, 12), (30, 8)])
+def test_consecutive_chunks_are_merged_without_repeated_text(chunk_size, chunk_overlap):
+    chunks = _chunks(TEXT, chunk_size, chunk_overlap)
+    assert len(chunks) > 3
+    # Retrieved out of order, most relevant first.
+    passages = ContextPacker(max_tokens=10000, max_overlap=chunk_overlap).passages(chunks[::-1])
+    assert [p.text for p in passages] == [TEXT]
+    assert passages[0].header() == "[manual.pdf, page 1]"
+
+
+def test_coincidental_match_is_not_overlap():
+    left = Document(page_content="It runs on oil", metadata={"source": "a.pdf", "chunk": 0})
+    right = Document(page_content="il pressure matters", metadata={"source": "a.pdf", "chunk": 1})
+    assert ContextPacker().passages([left, right])[0].text == "It runs on oil il pressure matters"
+
+
+def test_duplicates_and_contained_passages_are_kept_once():
+    chunks = _chunks(TEXT, 60, 30)
+    copy = [Document(page_content=c.page_content, metadata=dict(c.metadata, source="copy.pdf", file="copy.pdf"))
+            for c in chunks[:2]]
+    passages = ContextPacker(max_tokens=10000).passages(chunks + copy)
+    assert [p.text for p in passages] == [TEXT]
+
+
+def test_passages_are_added_by_relevance_within_the_budget():
+    best = Document(page_content="short answer", metadata={"source": "a.pdf", "page": 0})
+    long = Document(page_content="x" * 400, metadata={"source": "b.pdf", "page": 0})
+    other = Document(page_content="another short one", metadata={"source": "c.pdf", "page": 2})
+    packer = ContextPacker(max_tokens=20)
+
+    context = packer.pack([best, long, other])
+    # The long passage does not fit; a less relevant one that fits still does.
+    assert context == "[a.pdf, page 1]\nshort answer\n\n[c.pdf, page 3]\nanother short one"
+    assert estimate_tokens(context) <= packer.max_tokens
+
+
+def test_best_passage_longer_than_the_budget_is_truncated():
+    long = Document(page_content="y" * 400, metadata={"source": "b.pdf", "page": 0})
+    context = ContextPacker(max_tokens=20).pack([long])
+    assert context.startswith("[b.pdf, page 1]\nyyy")
+    assert len(context) == 20 * CHARS_PER_TOKEN
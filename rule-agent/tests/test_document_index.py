@@ -0,0 +1,43 @@
+"""
+Re-committing a changed document drops the chunks cached for its previous content, unless
+an identical copy under another path still uses them.
+"""
+
+import os
+
+from langchain_core.documents import Document
+
+from AIAgent import AIAgent
+
+
+class _Store:
+    def __init__(self):
+        self.deleted = []
+
+    def delete(self, ids=None):
+        self.deleted += ids
+
+
+def _commit(agent, path, fp):
+    chunks = [Document(page_content=f"{path} {fp}", metadata={"chunk": 0})]
+    agent.manifest.save_chunks(fp, chunks)
+    agent._commitDocument(path, fp, chunks, pages=1)
+
+
+def _cached(agent, fp):
+    return os.path.exists(os.path.join(agent.manifest.chunks_dir, fp + ".json"))
+
+
+def test_changed_document_drops_its_previous_chunk_cache(tmp_path):
+    agent = AIAgent(llm=None, index_dir=str(tmp_path))
+    agent.vector_store = _Store()
+
+    _commit(agent, "manual.pdf", "a" * 64)
+    _commit(agent, "copy.pdf", "a" * 64)
+    _commit(agent, "manual.pdf", "b" * 64)
+    assert agent.vector_store.deleted == [AIAgent._chunkId("manual.pdf", "a" * 64, 0)]
+    assert _cached(agent, "a" * 64)  # still used by copy.pdf
+
+    _commit(agent, "copy.pdf", "c" * 64)
+    assert not _cached(agent, "a" * 64)
+    assert _cached(agent, "b" * 64) and _cached(agent, "c" * 64)
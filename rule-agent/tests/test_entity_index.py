@@ -0,0 +1,26 @@
+"""
+The entity index follows individuals added to the ontology in place.
+"""
+
+from owlready2 import World
+
+from neuro_symbolic.entity_index import get_entity_index
+from neuro_symbolic.ontology_engine import define_ontology
+
+
+def test_entity_added_in_place_is_found():
+    onto = define_ontology(World())
+    assert get_entity_index(onto).get("piston_2") is None
+
+    with onto:
+        piston = onto.Piston("piston_2")
+        piston.CausesFailure.append(onto.oil_engine_1)
+
+    index = get_entity_index(onto)
+    assert index.get("piston_2") is piston
+    assert piston.storid in index.labels["piston"]
+
+
+def test_index_is_reused_while_the_world_is_unchanged():
+    onto = define_ontology(World())
+    assert get_entity_index(onto) is get_entity_index(onto)
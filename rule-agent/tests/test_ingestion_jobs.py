@@ -0,0 +1,65 @@
+"""
+Removal jobs delete uploaded files after the queued ingestion of the same file, and
+tolerate files that are already gone or were uploaded again.
+"""
+
+import os
+import threading
+import time
+
+from IngestionJobs import DONE, REMOVE, IngestionQueue
+
+
+class _Agent:
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = []
+
+    def ingestDocuments(self, paths, stats=None):
+        self.release.wait(10)
+        self.calls.append(("ingest", [os.path.exists(p) for p in paths]))
+
+    def removeDocuments(self, paths, stats=None):
+        self.calls.append(("remove", list(paths)))
+
+
+def _wait(queue, job, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while queue.status(job.id)["status"] != DONE:
+        assert time.monotonic() < deadline, queue.status(job.id)
+        time.sleep(0.01)
+
+
+def test_uploaded_file_is_deleted_after_pending_ingestion(tmp_path):
+    upload = tmp_path / "policy.pdf"
+    upload.write_bytes(b"%PDF-")
+    agent = _Agent()
+    queue = IngestionQueue(agent)
+
+    queue.submit([str(upload)])
+    removal = queue.submit([str(upload)], action=REMOVE, delete_files=[str(upload)])
+    assert upload.exists()
+    agent.release.set()
+    _wait(queue, removal)
+
+    assert agent.calls == [("ingest", [True]), ("remove", [str(upload)])]
+    assert not upload.exists()
+
+
+def test_missing_or_replaced_files_are_left_alone(tmp_path):
+    missing, replaced = tmp_path / "missing.pdf", tmp_path / "replaced.pdf"
+    replaced.write_bytes(b"%PDF- old")
+    agent = _Agent()
+    queue = IngestionQueue(agent)
+
+    blocker = queue.submit([])
+    removal = queue.submit([str(missing), str(replaced)], action=REMOVE,
+                           delete_files=[str(missing), str(replaced)])
+    # Uploaded again before the removal runs.
+    replaced.with_suffix(".part").write_bytes(b"%PDF- new")
+    os.replace(replaced.with_suffix(".part"), replaced)
+    agent.release.set()
+    _wait(queue, blocker)
+    _wait(queue, removal)
+
+    assert replaced.read_bytes() == b"%PDF- new"
@@ -0,0 +1,58 @@
+"""
+The process pool of the ingestion pipeline, driven from a script that ingests at import
+time without a __main__ guard (like running python ChatService.py).
+"""
+
+import os
+import subprocess
+import sys
+import textwrap
+
+
+def _write_pdf(path, pages):
+    """A minimal PDF with one line of text per page."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (len(objects)))
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % kid for kid in kids), len(kids))
+
+    out, offsets = bytearray(b"%PDF-1.4\n"), []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    path.write_bytes(bytes(out))
+
+
+def test_pool_from_an_unguarded_script(tmp_path):
+    pdf = tmp_path / "manual.pdf"
+    _write_pdf(pdf, [f"Page {number} of the manual" for number in range(4)])
+    script = tmp_path / "ingest.py"
+    script.write_text(textwrap.dedent(f"""
+        from IngestionPipeline import IngestionPipeline
+
+        pages = []
+        IngestionPipeline(chunk_size=200, chunk_overlap=0, workers=2, pages_per_task=1).run(
+            [{str(pdf)!r}], on_batch=lambda chunks: None,
+            on_document=lambda path, chunks, count: pages.extend(c.page_content for c in chunks))
+        print("PAGES", pages)
+    """))
+    rule_agent = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=rule_agent)
+
+    result = subprocess.run([sys.executable, str(script)], cwd=tmp_path, env=env,
+                            capture_output=True, text=True, timeout=300)
+
+    assert result.returncode == 0, result.stderr
+    lines = [line for line in result.stdout.splitlines() if line.startswith("PAGES")]
+    assert lines == ["PAGES " + repr([f"Page {number} of the manual" for number in range(4)])]
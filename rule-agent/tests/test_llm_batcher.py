@@ -0,0 +1,94 @@
+"""
+LLM micro-batching: concurrent prompts are sent as one batch, each caller gets its own
+result or error, and batch() follows Runnable.batch for configs and exceptions.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from langchain_core.language_models.fake import FakeListLLM
+from langchain_core.runnables import Runnable
+
+from LLMBatcher import LLMBatcher, batched_llm
+
+
+class _LLM(Runnable):
+    """Echoes its prompts; a prompt containing "fail" raises."""
+
+    def __init__(self):
+        self.batches = []
+        self._lock = threading.Lock()
+
+    def invoke(self, input, config=None, **kwargs):
+        if "fail" in input:
+            raise RuntimeError(f"cannot answer {input}")
+        return f"answer to {input}"
+
+    def batch(self, inputs, config=None, *, return_exceptions=False, **kwargs):
+        with self._lock:
+            self.batches.append((list(inputs), config))
+        return super().batch(inputs, config, return_exceptions=return_exceptions, **kwargs)
+
+
+class WatsonxLLM(_LLM):
+    """Stands in for the multi-prompt watsonx.ai back-end."""
+
+
+def test_concurrent_prompts_are_sent_as_one_batch():
+    llm = _LLM()
+    batcher = LLMBatcher(llm, max_batch_size=4, max_delay_ms=500)
+    prompts = [f"prompt {i}" for i in range(4)]
+    with ThreadPoolExecutor(4) as pool:
+        answers = list(pool.map(batcher.invoke, prompts))
+
+    assert answers == [f"answer to {p}" for p in prompts]
+    assert len(llm.batches) == 1 and sorted(llm.batches[0][0]) == prompts
+    metrics = batcher.metrics.as_dict()
+    assert metrics["batches"] == 1 and metrics["prompts"] == 4 and metrics["batch_sizes"] == {4: 1}
+
+
+def test_batch_passes_one_config_per_prompt():
+    llm = _LLM()
+    batcher = LLMBatcher(llm, max_batch_size=8, max_delay_ms=100)
+    configs = [{"tags": [f"request {i}"]} for i in range(3)]
+
+    assert batcher.batch(["a", "b", "c"], configs) == ["answer to a", "answer to b", "answer to c"]
+    assert [c["tags"] for c in llm.batches[0][1]] == [["request 0"], ["request 1"], ["request 2"]]
+    assert batcher.batch([]) == []
+
+
+def test_batch_rejects_a_config_list_of_another_length():
+    batcher = LLMBatcher(_LLM(), max_batch_size=8)
+    with pytest.raises(ValueError):
+        batcher.batch(["a", "b", "c"], [{"tags": ["only one"]}])
+
+
+def test_errors_reach_only_their_callers():
+    batcher = LLMBatcher(_LLM(), max_batch_size=8, max_delay_ms=100)
+
+    results = batcher.batch(["a", "fail b", "c"], return_exceptions=True)
+    assert results[0] == "answer to a" and results[2] == "answer to c"
+    assert isinstance(results[1], RuntimeError)
+    with pytest.raises(RuntimeError, match="cannot answer fail b"):
+        batcher.batch(["a", "fail b"])
+    assert batcher.metrics.as_dict()["errors"] == 2
+
+
+def test_failing_backend_fails_every_prompt_of_the_batch():
+    class _Down(_LLM):
+        def batch(self, inputs, config=None, **kwargs):
+            raise ConnectionError("back-end down")
+
+    batcher = LLMBatcher(_Down(), max_batch_size=8, max_delay_ms=100)
+    results = batcher.batch(["a", "b"], return_exceptions=True)
+    assert all(isinstance(r, ConnectionError) for r in results)
+    # The slot was released: the next batch still runs.
+    assert isinstance(batcher.batch(["c"], return_exceptions=True)[0], ConnectionError)
+
+
+def test_only_multi_prompt_backends_are_wrapped():
+    assert isinstance(batched_llm(WatsonxLLM(), max_batch_size=8), LLMBatcher)
+    single = FakeListLLM(responses=["ok"])
+    assert batched_llm(single, max_batch_size=8) is single
+    assert batched_llm(WatsonxLLM(), max_batch_size=1).__class__ is WatsonxLLM
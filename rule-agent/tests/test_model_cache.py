@@ -0,0 +1,59 @@
+"""
+The model cache key follows every ontology of the world, not only the main one; for an
+ontology store it comes from the recorded file hashes, without serializing the world.
+"""
+
+from owlready2 import Thing, World
+
+from neuro_symbolic import model_cache
+from neuro_symbolic.model_cache import model_cache_key
+from neuro_symbolic.ontology_engine import define_ontology
+from neuro_symbolic.ontology_store import open_ontology_store
+
+CONFIG = {"mode": "batch"}
+
+
+def test_key_changes_with_a_secondary_ontology():
+    world = World()
+    onto = define_ontology(world)
+    secondary = world.get_ontology("http://example.org/secondary.owl")
+    key = model_cache_key(onto, CONFIG)
+    assert model_cache_key(onto, CONFIG) == key
+
+    with secondary:
+        class Turbine(Thing):
+            pass
+    assert model_cache_key(onto, CONFIG) != key
+
+
+def test_key_is_the_same_for_the_same_content():
+    assert model_cache_key(define_ontology(World()), CONFIG) == model_cache_key(define_ontology(World()), CONFIG)
+
+
+def test_store_key_comes_from_the_file_hashes(tmp_path, monkeypatch):
+    def no_world_hash(onto):
+        raise AssertionError("the store world was serialized")
+
+    monkeypatch.setattr(model_cache, "world_hash", no_world_hash)
+    main, secondary = tmp_path / "engine.owl", tmp_path / "turbines.owl"
+    define_ontology(World()).save(file=str(main))
+    turbines = World().get_ontology("http://example.org/turbines.owl")
+    turbines.save(file=str(secondary))
+    store = str(tmp_path / "store" / "quadstore.sqlite3")
+
+
+    def store_key():
+        onto = open_ontology_store([main, secondary], store, reasoning=False)
+        try:
+            return model_cache_key(onto, CONFIG)
+        finally:
+            onto.world.close()
+
+    key = store_key()
+    assert store_key() == key
+
+    with turbines:
+        class Turbine(Thing):
+            pass
+    turbines.save(file=str(secondary))
+    assert store_key() != key
@@ -0,0 +1,68 @@
+"""
+NumPy vector store: float16 and int8 rows rank and score like float32 ones, also after a
+persist/load round trip (memory-mapped).
+"""
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from NumpyVectorStore import NumpyVectorStore
+
+DIMENSIONS = 64
+
+
+class _Embeddings(Embeddings):
+    """A fixed random vector per text."""
+
+    def __init__(self, texts):
+        rng = np.random.default_rng(7)
+        self.vectors = {text: rng.normal(size=DIMENSIONS) for text in texts}
+
+    def embed_documents(self, texts):
+        return [self.vectors[t].tolist() for t in texts]
+
+    def embed_query(self, text):
+        return self.vectors[text].tolist()
+
+
+TEXTS = [f"chunk {i}" for i in range(500)]
+EMBEDDINGS = _Embeddings(TEXTS)
+
+
+def _search(store, query, k=10):
+    return [(doc.page_content, score) for doc, score in store.similarity_search_with_score(query, k)]
+
+
+@pytest.mark.parametrize("dtype, tolerance", [("float16", 1e-3), ("int8", 2e-2)])
+def test_quantized_scores_match_float32(dtype, tolerance):
+    exact = NumpyVectorStore.from_texts(TEXTS, EMBEDDINGS)
+    quantized = NumpyVectorStore.from_texts(TEXTS, EMBEDDINGS, dtype=dtype)
+    assert quantized._snapshot.vectors.dtype == np.dtype(dtype)
+
+    for query in TEXTS[:20]:
+        expected, found = _search(exact, query), _search(quantized, query)
+        assert found[0] == (query, pytest.approx(0.0, abs=tolerance))
+        scores = dict(expected)
+        for text, score in found:
+            # Same neighbours, up to ties within the quantization error.
+            assert text in scores or score - expected[-1][1] <= tolerance
+            if text in scores:
+                assert score == pytest.approx(scores[text], abs=tolerance)
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16", "int8"])
+def test_persisted_store_is_memory_mapped_and_scores_the_same(tmp_path, dtype):
+    store = NumpyVectorStore(EMBEDDINGS, dtype=dtype, persist_directory=str(tmp_path))
+    store.add_texts(TEXTS, metadatas=[{"chunk": i} for i in range(len(TEXTS))])
+    store.persist()
+
+    loaded = NumpyVectorStore(EMBEDDINGS, dtype=dtype, persist_directory=str(tmp_path))
+    assert isinstance(loaded._snapshot.vectors, np.memmap)
+    assert _search(loaded, "chunk 3") == _search(store, "chunk 3")
+    assert loaded.similarity_search("chunk 3", k=1)[0].metadata == {"chunk": 3}
+
+
+def test_store_with_another_dtype_starts_over(tmp_path):
+    NumpyVectorStore.from_texts(TEXTS, EMBEDDINGS, dtype="int8", persist_directory=str(tmp_path)).persist()
+    assert NumpyVectorStore(EMBEDDINGS, dtype="float16", persist_directory=str(tmp_path)).get()["ids"] == []
@@ -0,0 +1,59 @@
+"""
+Direct answers from the ontology: confident questions about the ontology are answered
+without the LLM, off-topic questions fall back to it.
+"""
+
+import pytest
+
+
+@pytest.fixture
+def answer(fake_reasoner):
+    from neuro_symbolic.ml_model import convert_to_logical_batch, modelizer
+    from neuro_symbolic.ontology_answering import ANSWER_TOP_K, answer_from_ontology
+    from neuro_symbolic.ontology_engine import create_ontology
+
+    onto = create_ontology()
+    model, vectorizer = modelizer(onto, use_cache=False)
+
+    def answer(question, **thresholds):
+        candidates = convert_to_logical_batch([question], model, vectorizer, ANSWER_TOP_K)[0]
+        return answer_from_ontology(onto, candidates, **thresholds)
+
+    return answer
+
+
+def test_confident_question_is_answered_from_the_ontology(answer):
+    result = answer("Piston causes failure of Oil engine")
+    assert result.logical_form == "piston_1.CausesFailure(oil_engine_1)"
+    assert result.answer is not None and result.answer.startswith("Yes.")
+
+
+@pytest.mark.parametrize("question", ["What about the weather?", "What is the capital of France?"])
+def test_off_topic_question_falls_back_to_the_llm(answer, question):
+    result = answer(question)
+    assert result.answer is None
+    assert result.evaluations
+    # Ranked by the model's prior alone: rejected on probability even when any ratio passes.
+    assert answer(question, min_confidence=0.5).answer is None
+
+
+def test_agent_returns_the_same_shape_with_or_without_the_llm(fake_reasoner, tmp_path, monkeypatch):
+    import json
+
+    from langchain_core.language_models.fake import FakeListLLM
+
+    import RuleAIAgent as agent_module
+    from ODMService import ODMService
+
+    for name in ("ODM_SERVER_URL", "ADS_SERVER_URL"):
+        monkeypatch.setenv(name, "127.0.0.1:1")
+    monkeypatch.setenv("DATADIR", str(tmp_path / "data"))
+    monkeypatch.setattr(agent_module, "ADVANCED_MODE", True)
+    agent = agent_module.RuleAIAgent(FakeListLLM(responses=["unused"]),
+                                     {"odm": ODMService(), "ads": ODMService()})
+
+    direct = json.loads(agent.processMessage("Piston causes failure of Oil engine"))
+    via_llm = json.loads(agent.processMessage("What about the weather?"))
+    assert set(direct) == set(via_llm) == {"input", "output"}
+    assert direct["output"].startswith("Yes.")
+    assert via_llm["input"] == "What about the weather?" and via_llm["output"]
@@ -0,0 +1,102 @@
+"""
+Re-classification through the service: POST /rule-agent/ontology/reclassify swaps in the
+reasoned ontology and notifies the holder's listeners, which retrain the agent's model.
+
+The Java reasoner is replaced by one that writes the asserted ontology unchanged.
+"""
+
+import importlib
+import io
+import sys
+import time
+
+import pytest
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch, fake_reasoner):
+    for name, value in {
+        "LLM_TYPE": "LOCAL_OLLAMA",
+        "USE_NEURO_SYMBOLIC": "0",
+        "ODM_SERVER_URL": "127.0.0.1:1",
+        "ADS_SERVER_URL": "127.0.0.1:1",
+        "DATADIR": str(tmp_path / "data"),
+        "UPLOAD_DIR": str(tmp_path / "uploads"),
+        "RAG_INDEX_DIR": str(tmp_path / "index"),
+    }.items():
+        monkeypatch.setenv(name, value)
+    sys.modules.pop("ChatService", None)
+    return importlib.import_module("ChatService")
+
+
+def _wait_for_version(client, version, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = client.get("/rule-agent/ontology").get_json()
+        if status["version"] >= version and not status["reclassifying"]:
+            return status
+        time.sleep(0.05)
+    pytest.fail(f"Ontology version {version} was not swapped in: {status}")
+
+
+def test_reclassify_route_swaps_ontology_and_notifies_listeners(service):
+    from owlready2 import World
+    from neuro_symbolic.ontology_engine import define_ontology
+
+    client = service.app.test_client()
+    holder = service.ontology_holder()
+    swapped = []
+    holder.listeners.append(swapped.append)
+    assert client.get("/rule-agent/ontology").get_json()["version"] == 0
+
+    asserted = define_ontology(World())
+    with asserted:
+        asserted.Motor("motor_2").CausesFailure.append(asserted.electric_engine_1)
+    owl = io.BytesIO()
+    asserted.save(file=owl, format="rdfxml")
+    owl.seek(0)
+
+    response = client.post("/rule-agent/ontology/reclassify", data={"file": (owl, "engine.owl")},
+                           content_type="multipart/form-data")
+    assert response.status_code == 202
+    status = _wait_for_version(client, 1)
+
+    assert status["last_error"] is None
+    assert swapped == [holder.current]
+    assert holder.current.motor_2 is not None
+    rows = client.post("/rule-agent/sparql", json={
+        "query": "SELECT ?x WHERE { ?x ??1 ??2 }", "params": ["CausesFailure", "electric_engine_1"],
+    }).get_json()["rows"]
+    assert ["motor_2"] in rows
+
+
+def test_reclassify_route_rejects_invalid_ontology(service):
+    client = service.app.test_client()
+    response = client.post("/rule-agent/ontology/reclassify", data={"file": (io.BytesIO(b"not owl"), "x.owl")},
+                           content_type="multipart/form-data")
+    assert response.status_code == 400
+    assert client.get("/rule-agent/ontology").get_json()["version"] == 0
+
+
+def test_batch_model_is_retrained_after_a_swap(fake_reasoner, tmp_path, monkeypatch):
+    from langchain_core.language_models.fake import FakeListLLM
+    from owlready2 import World
+
+    import RuleAIAgent as agent_module
+    from neuro_symbolic.ontology_engine import define_ontology
+    from ODMService import ODMService
+
+    for name in ("ODM_SERVER_URL", "ADS_SERVER_URL"):
+        monkeypatch.setenv(name, "127.0.0.1:1")
+    monkeypatch.setenv("DATADIR", str(tmp_path / "data"))
+    monkeypatch.setattr(agent_module, "ADVANCED_MODE", True)
+    agent = agent_module.RuleAIAgent(FakeListLLM(responses=["unused"]),
+                                     {"odm": ODMService(), "ads": ODMService()})
+    assert "motor_2" not in agent.model.classifiers["subject"].classes_
+
+    onto = define_ontology(World())
+    with onto:
+        onto.Motor("motor_2").CausesFailure.append(onto.electric_engine_1)
+    agent.ontology_holder.swap(onto)
+
+    assert "motor_2" in agent.model.classifiers["subject"].classes_
@@ -0,0 +1,51 @@
+"""
+Re-classification results keep every ontology of the world, not only the main one, and are
+cached under a key that covers all of them.
+"""
+
+from owlready2 import Thing, World
+
+from neuro_symbolic import ontology_engine
+from neuro_symbolic.ontology_engine import define_ontology, update_ontology
+
+
+def test_secondary_ontologies_survive_an_update(fake_reasoner):
+    onto = define_ontology(World())
+    secondary = onto.world.get_ontology("http://example.org/turbines.owl")
+    with secondary:
+        class Turbine(Thing):
+            pass
+        Turbine("turbine_1").CausesFailure = [onto.electric_engine_1]
+
+    reasoned = update_ontology(onto)
+
+    assert reasoned.world is not onto.world
+    assert reasoned.base_iri == onto.base_iri
+    turbine = reasoned.world["http://example.org/turbines.owl#turbine_1"]
+    assert turbine is not None and turbine.namespace.ontology.base_iri == secondary.base_iri
+    assert [e.name for e in turbine.CausesFailure] == ["electric_engine_1"]
+    assert reasoned.world["http://example.org/turbines.owl#Turbine"] in turbine.is_a
+
+
+def test_change_in_a_secondary_ontology_is_reasoned_over(fake_reasoner, monkeypatch):
+    runs = []
+    reasoner = ontology_engine.run_reasoner
+
+    def counting_reasoner(onto, output_path, **options):
+        runs.append(output_path)
+        reasoner(onto, output_path, **options)
+
+    monkeypatch.setattr(ontology_engine, "run_reasoner", counting_reasoner)
+    onto = define_ontology(World())
+    secondary = onto.world.get_ontology("http://example.org/turbines.owl")
+
+    update_ontology(onto)
+    update_ontology(onto)
+    assert len(runs) == 1
+
+    with secondary:
+        class Turbine(Thing):
+            pass
+    reasoned = update_ontology(onto)
+    assert len(runs) == 2
+    assert reasoned.world["http://example.org/turbines.owl#Turbine"] is not None
@@ -0,0 +1,34 @@
+"""
+Prepared SPARQL queries are cached per world, and dropped when the ontology holder swaps
+the world out.
+"""
+
+from owlready2 import World
+
+from neuro_symbolic.ontology_engine import OntologyHolder, define_ontology
+from neuro_symbolic.sparql_queries import QueryCache, _cache, sparql_query
+
+QUERY = "SELECT ?x WHERE { ?x a ??1 }"
+
+
+def _cached(world):
+    return [key for key in _cache._queries if key[0]() is world]
+
+
+def test_each_world_has_its_own_prepared_query():
+    cache = QueryCache()
+    first, second = World(), World()
+    assert cache.prepare(first, QUERY) is cache.prepare(first, QUERY)
+    assert cache.prepare(second, QUERY) is not cache.prepare(first, QUERY)
+    assert cache.stats() == {"size": 2, "hits": 2, "misses": 2}
+
+
+def test_swap_drops_the_queries_of_the_previous_world():
+    old, new = define_ontology(World()), define_ontology(World())
+    holder = OntologyHolder(old)
+    assert [r[0].name for r in sparql_query(old, QUERY, [old.Piston])] == ["piston_1"]
+    assert _cached(old.world)
+
+    holder.swap(new)
+    assert not _cached(old.world)
+    assert [r[0].name for r in sparql_query(new, QUERY, [new.Piston])] == ["piston_1"]